@@ -11,9 +11,8 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from vision_karts.core import ProductDetector, BillingEngine, CustomerTracker
-from vision_karts.utils import load_image, visualize_detections
-import cv2
+# Heavy imports (cv2, ultralytics, torch) are deferred into each example
+# function so the script starts instantly and examples fail independently
 
 
 def example_product_detection():
@@ -21,7 +20,11 @@ def example_product_detection():
     print("=" * 60)
     print("Example 1: Product Detection")
     print("=" * 60)
-    
+
+    import cv2
+    from vision_karts.core import ProductDetector
+    from vision_karts.utils import load_image
+
     # Initialize detector
     detector = ProductDetector(
         confidence_threshold=0.5,
@@ -56,7 +59,10 @@ def example_billing():
     print("\n" + "=" * 60)
     print("Example 2: Billing Calculation")
     print("=" * 60)
-    
+
+    from vision_karts.core import ProductDetector, BillingEngine
+    from vision_karts.utils import load_image
+
     # Initialize components
     detector = ProductDetector(confidence_threshold=0.5)
     billing = BillingEngine("src/prices.csv")
@@ -82,7 +88,10 @@ def example_customer_tracking():
     print("\n" + "=" * 60)
     print("Example 3: Customer Tracking")
     print("=" * 60)
-    
+
+    import cv2
+    from vision_karts.core import CustomerTracker
+
     # Initialize tracker (requires known_faces directory)
     known_faces_dir = "data/customers/"  # Update with your directory
     
@@ -118,7 +127,12 @@ def example_complete_checkout():
     print("\n" + "=" * 60)
     print("Example 4: Complete Checkout Flow")
     print("=" * 60)
-    
+
+    from vision_karts.core import ProductDetector, BillingEngine
+    from vision_karts.utils import (
+        load_image, save_annotated_async, visualize_detections
+    )
+
     # Initialize all components
     detector = ProductDetector(
         confidence_threshold=0.5,
@@ -126,28 +140,37 @@ def example_complete_checkout():
     )
     billing = BillingEngine("src/prices.csv")
     
-    # Process image
-    image_path = "path/to/shopping_cart.jpg"
-    if not Path(image_path).exists():
-        print(f"Image not found: {image_path}")
+    # Process images (add more paths to batch several camera frames)
+    image_paths = [
+        "path/to/shopping_cart.jpg",
+    ]
+    image_paths = [p for p in image_paths if Path(p).exists()]
+    if not image_paths:
+        print("No input images found. Update the image_paths list.")
         return
-    
-    print(f"\nProcessing image: {image_path}")
-    image = load_image(image_path)
-    
-    # Detect products
-    detections, annotated = detector.detect(image, return_image=True)
+
+    # Accumulate frames and dispatch them through a single batched
+    # model call instead of one forward pass per frame. For large
+    # CPU-only batches, vision_karts.pipeline.process_images_parallel
+    # spreads the work over a process pool instead.
+    print(f"\nProcessing {len(image_paths)} image(s) in one batch")
+    images = [load_image(p) for p in image_paths]
+    batch_detections = detector.detect_batch(images)
+
+    # Combine detections from all frames into one checkout
+    detections = [d for frame_dets in batch_detections for d in frame_dets]
     print(f"Detected {len(detections)} product instances")
-    
+
     # Generate bill
     bill = billing.generate_bill(detections)
-    
+
     # Display results
     print("\n" + billing.format_bill(bill))
-    
-    # Save annotated image
+
+    # Save annotated image of the first frame (encoded off-thread)
+    annotated = visualize_detections(images[0], batch_detections[0])
     output_path = "checkout_result.jpg"
-    cv2.imwrite(output_path, annotated)
+    save_annotated_async(output_path, annotated).result()
     print(f"\nAnnotated image saved to: {output_path}")
 
 
@@ -6,13 +6,14 @@ Next-generation automated checkout system using state-of-the-art computer vision
 """
 
 import argparse
+import functools
 import logging
 import sys
 from pathlib import Path
-import cv2
 
-from vision_karts.core import ProductDetector, BillingEngine, CustomerTracker
-from vision_karts.utils import load_image, visualize_detections
+# Heavy imports (cv2, ultralytics, torch via vision_karts.core) are
+# deferred into main() so --help and argument-validation failures don't
+# pay seconds of module load
 
 # Setup logging
 logging.basicConfig(
@@ -21,16 +22,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+VIDEO_SUFFIXES = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+STREAM_PREFIXES = ('rtsp://', 'rtmp://', 'http://', 'https://')
 
-def main():
-    """Main entry point for Vision Karts checkout system."""
+# Frames accumulated per batched model call when streaming video
+VIDEO_BATCH_SIZE = 16
+
+
+def _is_video_source(path: str) -> bool:
+    """Check whether an input argument is a video file or stream URL."""
+    if path.startswith(STREAM_PREFIXES):
+        return True
+    return Path(path).suffix.lower() in VIDEO_SUFFIXES
+
+
+def _process_video(detector, billing_engine, source: str, store_name: str):
+    """Stream a video source through rolling batched detection windows."""
+    from vision_karts.pipeline import stream_frames
+
+    logger.info(f"Streaming video source: {source}")
+    window = []
+    window_index = 0
+
+    def flush():
+        nonlocal window_index
+        batch_detections = detector.detect_batch(window)
+        detections = [d for frame_dets in batch_detections for d in frame_dets]
+        window_index += 1
+        logger.info(
+            f"Window {window_index}: {len(window)} frames, "
+            f"{len(detections)} detections"
+        )
+        bill = billing_engine.generate_bill(detections, store_name)
+        print(f"\n[window {window_index}]")
+        print(billing_engine.format_bill(bill) + "\n")
+        window.clear()
+
+    for frame, _timestamp in stream_frames(source):
+        window.append(frame)
+        if len(window) >= VIDEO_BATCH_SIZE:
+            flush()
+
+    if window:
+        flush()
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser (memoized for repeated in-process calls)."""
     parser = argparse.ArgumentParser(
         description='Vision Karts - Automated Checkout System'
     )
     parser.add_argument(
         'image_path',
         type=str,
-        help='Path to input image'
+        nargs='+',
+        help='Input image path(s), video file, or RTSP stream URL; '
+             'multiple images are batched through one model call'
     )
     parser.add_argument(
         '--model',
@@ -74,21 +122,35 @@ def main():
         help='Device to use (auto, cpu, cuda, 0, 1, etc.)'
     )
     
-    args = parser.parse_args()
-    
-    # Validate inputs
-    if not Path(args.image_path).exists():
-        logger.error(f"Image not found: {args.image_path}")
-        sys.exit(1)
+    return parser
+
+
+def main():
+    """Main entry point for Vision Karts checkout system."""
+    # Parsing (and the --help exit path) happens before any heavy import,
+    # so `vision-karts --help` never pays cv2/torch startup cost
+    args = _build_parser().parse_args()
+
+    # Validate inputs (stream URLs can only be validated by opening them)
+    for image_path in args.image_path:
+        if not image_path.startswith(STREAM_PREFIXES) and not Path(image_path).exists():
+            logger.error(f"Input not found: {image_path}")
+            sys.exit(1)
     
     if not Path(args.prices).exists():
         logger.error(f"Price file not found: {args.prices}")
         sys.exit(1)
     
+    # Import heavy dependencies only after validation passed
+    from vision_karts.core import ProductDetector, BillingEngine
+    from vision_karts.utils import load_image, save_annotated_async
+
+    pending_writes = []
+
     try:
         # Initialize components
         logger.info("Initializing Vision Karts system...")
-        
+
         detector = ProductDetector(
             model_path=args.model,
             confidence_threshold=args.confidence,
@@ -98,26 +160,53 @@ def main():
         
         billing_engine = BillingEngine(args.prices)
         
-        # Load and process image
-        logger.info(f"Processing image: {args.image_path}")
-        image = load_image(args.image_path)
-        
-        # Detect products
-        detections, annotated_image = detector.detect(image, return_image=True)
-        
-        logger.info(f"Detected {len(detections)} products")
-        
-        # Generate bill
-        bill = billing_engine.generate_bill(detections, args.store_name)
-        
-        # Print bill
-        print("\n" + billing_engine.format_bill(bill) + "\n")
-        
-        # Save annotated image if requested
-        if args.output:
-            cv2.imwrite(args.output, annotated_image)
-            logger.info(f"Saved annotated image to: {args.output}")
-        
+        if len(args.image_path) == 1 and _is_video_source(args.image_path[0]):
+            # Video/stream input: rolling batched windows over decoded frames
+            _process_video(
+                detector, billing_engine, args.image_path[0], args.store_name
+            )
+            if args.output:
+                logger.warning("--output is only supported for single-image runs")
+        elif len(args.image_path) == 1:
+            # Single image: keep the annotated-output path
+            logger.info(f"Processing image: {args.image_path[0]}")
+            image = load_image(args.image_path[0])
+
+            detections, annotated_image = detector.detect(image, return_image=True)
+
+            logger.info(f"Detected {len(detections)} products")
+
+            # Generate bill
+            bill = billing_engine.generate_bill(detections, args.store_name)
+
+            # Print bill
+            print("\n" + billing_engine.format_bill(bill) + "\n")
+
+            # Save annotated image if requested (encode runs on a writer
+            # thread; we only wait on it before exit)
+            if args.output:
+                pending_writes.append(save_annotated_async(args.output, annotated_image))
+                logger.info(f"Saving annotated image to: {args.output}")
+        else:
+            # Multiple images: one batched forward pass amortizes model overhead
+            logger.info(f"Processing {len(args.image_path)} images in one batch")
+            images = [load_image(path) for path in args.image_path]
+
+            batch_detections = detector.detect_batch(images)
+
+            for image_path, detections in zip(args.image_path, batch_detections):
+                logger.info(f"{image_path}: {len(detections)} products")
+                bill = billing_engine.generate_bill(detections, args.store_name)
+                print(f"\n[{image_path}]")
+                print(billing_engine.format_bill(bill) + "\n")
+
+            if args.output:
+                logger.warning("--output is only supported for single-image runs")
+
+        # Drain background image writes before exiting
+        for future in pending_writes:
+            future.result()
+
         logger.info("Processing complete!")
         
     except Exception as e:
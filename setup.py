@@ -59,8 +59,6 @@ setup(
         "opencv-python>=4.8.0",
         "numpy>=1.24.0",
         "Pillow>=10.0.0",
-        "face-recognition>=1.3.0",
-        "dlib>=19.24.0",
         "pandas>=2.0.0",
         "torch>=2.0.0",
         "torchvision>=0.15.0",
@@ -70,6 +68,14 @@ setup(
         "acceleration": [
             "onnxruntime>=1.15.0",
         ],
+        "face": [
+            "onnxruntime>=1.15.0",
+            "faiss-cpu>=1.7.4",
+        ],
+        "face-dlib": [
+            "face-recognition>=1.3.0",
+            "dlib>=19.24.0",
+        ],
         "gpu": [
             "onnxruntime-gpu>=1.15.0",
         ],
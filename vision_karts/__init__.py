@@ -5,5 +5,16 @@ A state-of-the-art automated checkout system leveraging cutting-edge
 computer vision models for seamless retail experiences.
 """
 
+import importlib
+
 __version__ = "2.0.0"
 __author__ = "Vision Karts Team"
+
+_SUBMODULES = ('core', 'utils', 'analytics', 'accelerators', 'data', 'pipeline')
+
+
+def __getattr__(name):
+    """Lazily import subpackages so `import vision_karts` stays cheap."""
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,12 +4,68 @@ AI Acceleration Manager
 Provides optimized inference through TensorRT, ONNX Runtime, and other accelerators.
 """
 
+import hashlib
 import logging
+from pathlib import Path
 from typing import Optional
 import os
 
 logger = logging.getLogger(__name__)
 
+# Probed hardware/runtime capabilities, shared by all manager instances.
+# Importing torch/tensorflow costs seconds; pay it once per process.
+_CAPS_CACHE: Optional[dict] = None
+
+
+def _probe_caps() -> dict:
+    """Probe available devices and acceleration runtimes (memoized)."""
+    global _CAPS_CACHE
+    if _CAPS_CACHE is not None:
+        return _CAPS_CACHE
+
+    caps = {
+        'cuda': False,
+        'tf_gpu': False,
+        'tensorrt': False,
+        'onnxruntime': False,
+        'gpu_count': 0,
+        'gpu_name': None,
+    }
+
+    try:
+        import torch
+        if torch.cuda.is_available():
+            caps['cuda'] = True
+            caps['gpu_count'] = torch.cuda.device_count()
+            caps['gpu_name'] = torch.cuda.get_device_name(0)
+    except ImportError:
+        pass
+
+    # Only bother probing TensorFlow if torch did not already find a GPU
+    if not caps['cuda']:
+        os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+        try:
+            import tensorflow as tf
+            if tf.config.list_physical_devices('GPU'):
+                caps['tf_gpu'] = True
+        except ImportError:
+            pass
+
+    try:
+        import tensorrt  # noqa: F401
+        caps['tensorrt'] = True
+    except ImportError:
+        pass
+
+    try:
+        import onnxruntime  # noqa: F401
+        caps['onnxruntime'] = True
+    except ImportError:
+        pass
+
+    _CAPS_CACHE = caps
+    return caps
+
 
 class AcceleratorManager:
     """
@@ -17,6 +73,8 @@ class AcceleratorManager:
     
     Supports:
     - NVIDIA TensorRT (for NVIDIA GPUs)
+    - DeepSparse (sparsity-aware CPU inference)
+    - OpenVINO (Intel CPU/iGPU)
     - ONNX Runtime (CPU/GPU)
     - CUDA (via PyTorch/TensorFlow)
     """
@@ -31,7 +89,17 @@ class AcceleratorManager:
         """
         self.device = self._determine_device(device)
         self.backend = self._determine_backend(backend)
-        
+
+        # TensorRT engine export settings (see optimize_model)
+        self.engine_cache_dir: Optional[Path] = None
+        self.engine_imgsz = 640
+        self.engine_batch = 8
+        self.engine_half = True
+
+        # Lazily created by get_deepsparse_pipeline; set here so the
+        # method works on managers using any backend
+        self._deepsparse_pipeline = None
+
         logger.info(f"AcceleratorManager initialized: device={self.device}, backend={self.backend}")
         
         # Initialize backend
@@ -41,43 +109,41 @@ class AcceleratorManager:
         """Determine the best device to use."""
         if device != 'auto':
             return device
-        
-        # Check for CUDA availability
-        try:
-            import torch
-            if torch.cuda.is_available():
-                return 'cuda'
-        except ImportError:
-            pass
-        
-        try:
-            import tensorflow as tf
-            if tf.config.list_physical_devices('GPU'):
-                return 'cuda'
-        except ImportError:
-            pass
-        
+
+        caps = _probe_caps()
+        if caps['cuda'] or caps['tf_gpu']:
+            return 'cuda'
+
         return 'cpu'
-    
+
     def _determine_backend(self, backend: str) -> str:
         """Determine the best acceleration backend."""
         if backend != 'auto':
             return backend
-        
+
         # Prefer TensorRT for NVIDIA GPUs
         if self.device.startswith('cuda') or self.device.startswith('0') or self.device.startswith('1'):
-            try:
-                import tensorrt
+            if _probe_caps()['tensorrt']:
                 return 'tensorrt'
+        
+        # CPU-specific accelerators beat generic FP32 ONNX Runtime on
+        # VNNI-capable Xeons/Core CPUs, so try them first for CPU targets
+        if self.device == 'cpu':
+            try:
+                import deepsparse
+                return 'deepsparse'
             except ImportError:
                 pass
-        
+
+            try:
+                import openvino
+                return 'openvino'
+            except ImportError:
+                pass
+
         # Fallback to ONNX Runtime
-        try:
-            import onnxruntime
+        if _probe_caps()['onnxruntime']:
             return 'onnx'
-        except ImportError:
-            pass
         
         # Fallback to CUDA
         if self.device != 'cpu':
@@ -89,6 +155,10 @@ class AcceleratorManager:
         """Initialize the selected acceleration backend."""
         if self.backend == 'tensorrt':
             self._init_tensorrt()
+        elif self.backend == 'deepsparse':
+            self._init_deepsparse()
+        elif self.backend == 'openvino':
+            self._init_openvino()
         elif self.backend == 'onnx':
             self._init_onnx()
         elif self.backend == 'cuda':
@@ -100,26 +170,85 @@ class AcceleratorManager:
         """Initialize TensorRT backend."""
         try:
             import tensorrt as trt
-            logger.info("TensorRT backend initialized")
-            # TensorRT initialization would go here
-            # This is a placeholder for actual TensorRT setup
+
+            self.engine_cache_dir = Path(
+                os.environ.get("VK_ENGINE_CACHE", "~/.cache/vision-karts")
+            ).expanduser()
+            self.engine_cache_dir.mkdir(parents=True, exist_ok=True)
+
+            logger.info(f"TensorRT backend initialized (engine cache: {self.engine_cache_dir})")
         except ImportError:
             logger.warning("TensorRT not available, falling back to ONNX")
             self.backend = 'onnx'
             self._init_onnx()
     
+    def _init_deepsparse(self):
+        """Initialize DeepSparse backend."""
+        try:
+            import deepsparse  # noqa: F401
+            self._deepsparse_pipeline = None
+            logger.info("DeepSparse backend initialized")
+        except ImportError:
+            logger.warning("DeepSparse not available, falling back to ONNX")
+            self.backend = 'onnx'
+            self._init_onnx()
+
+    def _init_openvino(self):
+        """Initialize OpenVINO backend."""
+        try:
+            from openvino.runtime import Core
+            self.ov_core = Core()
+            logger.info(f"OpenVINO backend initialized (devices: {self.ov_core.available_devices})")
+        except ImportError:
+            logger.warning("OpenVINO not available, falling back to ONNX")
+            self.backend = 'onnx'
+            self._init_onnx()
+
+    def get_deepsparse_pipeline(self, model_path: str):
+        """
+        Get (and cache) a DeepSparse YOLO pipeline for a model.
+
+        Args:
+            model_path: Path to an ONNX model (ideally sparsified/quantized)
+
+        Returns:
+            deepsparse.Pipeline or None if DeepSparse is unavailable
+        """
+        try:
+            import deepsparse
+        except ImportError:
+            logger.warning("DeepSparse not available")
+            return None
+
+        if self._deepsparse_pipeline is None:
+            logger.info(f"Creating DeepSparse pipeline for {model_path}")
+            self._deepsparse_pipeline = deepsparse.Pipeline.create(
+                task="yolov8",
+                model_path=str(model_path)
+            )
+        return self._deepsparse_pipeline
+
     def _init_onnx(self):
         """Initialize ONNX Runtime backend."""
         try:
             import onnxruntime as ort
-            
+
             providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
             if self.device == 'cpu':
                 providers = ['CPUExecutionProvider']
-            
+
             self.ort_session_options = ort.SessionOptions()
             self.ort_session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-            
+            # Keep worker threads spinning between inferences and reuse the
+            # arena allocator, both of which cut per-call CPU latency
+            self.ort_session_options.add_session_config_entry(
+                "session.intra_op.allow_spinning", "1"
+            )
+            self.ort_providers = [
+                (p, {"use_arena": "1"}) if p == 'CPUExecutionProvider' else p
+                for p in providers
+            ]
+
             logger.info(f"ONNX Runtime backend initialized with providers: {providers}")
         except ImportError:
             logger.warning("ONNX Runtime not available")
@@ -138,39 +267,265 @@ class AcceleratorManager:
             logger.warning("PyTorch not available for CUDA acceleration")
             self.backend = 'cpu'
     
-    def optimize_model(self, model_path: str, output_path: Optional[str] = None):
+    def _engine_cache_key(self, model_path: str) -> str:
+        """Compute cache key identifying a (model, export settings) pair."""
+        mtime = Path(model_path).stat().st_mtime_ns
+        key = f"{model_path}:{mtime}:{self.engine_imgsz}:{self.engine_batch}:{self.engine_half}:{self.device}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+    def optimize_model(self, model_path: str, output_path: Optional[str] = None) -> Optional[str]:
         """
         Optimize a model for the selected acceleration backend.
-        
+
+        For the TensorRT backend this exports the YOLO model to an FP16
+        engine (fused conv+BN+activation, Tensor Core FP16 kernels) and
+        caches it keyed on the model file and export settings, so the
+        expensive export only runs once per model version.
+
         Args:
             model_path: Path to input model
             output_path: Path to save optimized model (optional)
+
+        Returns:
+            Path to the optimized model, or None if no optimization ran
         """
         if self.backend == 'tensorrt':
-            logger.info("TensorRT optimization not yet implemented")
-            # TensorRT optimization would go here
+            return self._export_tensorrt_engine(model_path, output_path)
+        elif self.backend == 'openvino':
+            return self._export_openvino(model_path)
+        elif self.backend == 'deepsparse':
+            # DeepSparse consumes ONNX directly via get_deepsparse_pipeline;
+            # export the .pt to ONNX if needed
+            return self._export_onnx(model_path)
         elif self.backend == 'onnx':
-            logger.info("ONNX optimization not yet implemented")
-            # ONNX optimization would go here
+            return self._export_onnx(model_path)
         else:
             logger.info("No optimization backend available")
+        return None
+
+    def _export_openvino(self, model_path: str) -> Optional[str]:
+        """Export a YOLO model to an OpenVINO IR directory (cached)."""
+        model_path = str(model_path)
+        if not Path(model_path).exists():
+            logger.warning(f"Model not found for OpenVINO export: {model_path}")
+            return None
+
+        ir_dir = Path(model_path).with_suffix('')
+        ir_dir = ir_dir.parent / f"{ir_dir.name}_openvino_model"
+        if ir_dir.exists():
+            logger.info(f"Using cached OpenVINO IR: {ir_dir}")
+            return str(ir_dir)
+
+        try:
+            from ultralytics import YOLO
+
+            logger.info(f"Exporting {model_path} to OpenVINO IR (one-time cost)")
+            exported = YOLO(model_path).export(format="openvino", imgsz=self.engine_imgsz)
+            logger.info(f"OpenVINO IR saved: {exported}")
+            return str(exported)
+        except Exception as e:
+            logger.warning(f"OpenVINO export failed, keeping original model: {e}")
+            return None
+
+    def _export_onnx(self, model_path: str) -> Optional[str]:
+        """Export a YOLO .pt model to ONNX (cached); pass ONNX through."""
+        model_path = str(model_path)
+        if model_path.endswith('.onnx'):
+            return model_path
+        if not Path(model_path).exists():
+            logger.warning(f"Model not found for ONNX export: {model_path}")
+            return None
+
+        onnx_path = Path(model_path).with_suffix('.onnx')
+        if onnx_path.exists():
+            logger.info(f"Using cached ONNX model: {onnx_path}")
+            return str(onnx_path)
+
+        try:
+            from ultralytics import YOLO
+
+            logger.info(f"Exporting {model_path} to ONNX (one-time cost)")
+            exported = YOLO(model_path).export(format="onnx", imgsz=self.engine_imgsz)
+            logger.info(f"ONNX model saved: {exported}")
+            return str(exported)
+        except Exception as e:
+            logger.warning(f"ONNX export failed, keeping original model: {e}")
+            return None
+
+    def _export_tensorrt_engine(
+        self,
+        model_path: str,
+        output_path: Optional[str] = None
+    ) -> Optional[str]:
+        """Export a YOLO model to a cached TensorRT FP16 engine."""
+        if self.engine_cache_dir is None:
+            logger.warning("TensorRT engine cache not initialized")
+            return None
+
+        model_path = str(model_path)
+        if not Path(model_path).exists():
+            logger.warning(f"Model not found for TensorRT export: {model_path}")
+            return None
+
+        stem = Path(model_path).stem
+        engine_path = (
+            Path(output_path) if output_path
+            else self.engine_cache_dir / f"{stem}_{self._engine_cache_key(model_path)}.engine"
+        )
+
+        if engine_path.exists():
+            logger.info(f"Using cached TensorRT engine: {engine_path}")
+            return str(engine_path)
+
+        try:
+            from ultralytics import YOLO
+
+            logger.info(f"Exporting {model_path} to TensorRT FP16 engine (one-time cost)")
+            exported = YOLO(model_path).export(
+                format="engine",
+                half=self.engine_half,
+                dynamic=True,
+                batch=self.engine_batch,
+                workspace=4,
+                imgsz=self.engine_imgsz,
+                device=self.device
+            )
+
+            # Move the exported engine next to the cache key
+            exported_path = Path(exported)
+            if exported_path != engine_path:
+                exported_path.replace(engine_path)
+
+            logger.info(f"TensorRT engine saved: {engine_path}")
+            return str(engine_path)
+        except Exception as e:
+            logger.warning(f"TensorRT export failed, keeping original model: {e}")
+            return None
+
+    def quantize_onnx(
+        self,
+        model_fp32_path: str,
+        calib_images_dir: str,
+        out_path: Optional[str] = None,
+        input_size: int = 640
+    ) -> Optional[str]:
+        """
+        Quantize an FP32 ONNX model to INT8 via static post-training quantization.
+
+        Calibrates on a small set of store images, producing a QDQ model
+        whose int8 weights and activations run on VNNI/AMX dot-product
+        instructions on recent CPUs — roughly 4x smaller and about 2x
+        faster than FP32 for convolution-heavy models.
+
+        Args:
+            model_fp32_path: Path to FP32 ONNX model
+            calib_images_dir: Directory with calibration images (.jpg/.png)
+            out_path: Output path (defaults to <model>_int8.onnx)
+            input_size: Model input size calibration images are resized to
+
+        Returns:
+            Path to the quantized model, or None on failure
+        """
+        if out_path is None:
+            out_path = str(Path(model_fp32_path).with_suffix('')) + '_int8.onnx'
+
+        if Path(out_path).exists():
+            logger.info(f"Using cached INT8 model: {out_path}")
+            return out_path
+
+        try:
+            import cv2
+            import numpy as np
+            from onnxruntime.quantization import (
+                CalibrationDataReader, QuantFormat, QuantType, quantize_static
+            )
+        except ImportError as e:
+            logger.warning(f"INT8 quantization requires onnxruntime, opencv and numpy: {e}")
+            return None
+
+        image_paths = sorted(
+            p for p in Path(calib_images_dir).iterdir()
+            if p.suffix.lower() in ('.jpg', '.jpeg', '.png')
+        )
+        if not image_paths:
+            logger.warning(f"No calibration images found in {calib_images_dir}")
+            return None
+
+        class _ImageFolderReader(CalibrationDataReader):
+            """Yields NCHW float tensors in [0, 1] from a directory of images."""
+
+            def __init__(self, paths, input_name):
+                self.paths = iter(paths)
+                self.input_name = input_name
+
+            def get_next(self):
+                path = next(self.paths, None)
+                if path is None:
+                    return None
+                image = cv2.imread(str(path))
+                if image is None:
+                    return self.get_next()
+                image = cv2.resize(image, (input_size, input_size))
+                tensor = image[..., ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+                return {self.input_name: tensor[np.newaxis]}
+
+        try:
+            import onnxruntime as ort
+            session = ort.InferenceSession(
+                model_fp32_path, providers=['CPUExecutionProvider']
+            )
+            input_name = session.get_inputs()[0].name
+
+            logger.info(
+                f"Quantizing {model_fp32_path} to INT8 "
+                f"({len(image_paths)} calibration images)"
+            )
+            quantize_static(
+                model_fp32_path,
+                out_path,
+                _ImageFolderReader(image_paths, input_name),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True
+            )
+
+            logger.info(f"INT8 model saved: {out_path}")
+            return out_path
+        except Exception as e:
+            logger.warning(f"INT8 quantization failed: {e}")
+            return None
+
+    def get_optimized_model_path(self, model_path: str) -> Optional[str]:
+        """
+        Get the optimized model path for a source model, exporting if needed.
+
+        Args:
+            model_path: Path to source model (.pt)
+
+        Returns:
+            Path to optimized model (e.g. .engine, _int8.onnx) or None
+        """
+        # Prefer a quantized sibling model for CPU-only ONNX deployments
+        if self.backend == 'onnx' and self.device == 'cpu':
+            int8_path = Path(str(Path(model_path).with_suffix('')) + '_int8.onnx')
+            if int8_path.exists():
+                logger.info(f"Using INT8 quantized model: {int8_path}")
+                return str(int8_path)
+
+        return self.optimize_model(model_path)
     
     def get_device_info(self) -> dict:
         """Get information about available acceleration devices."""
+        caps = _probe_caps()
         info = {
             'device': self.device,
             'backend': self.backend,
-            'cuda_available': False,
-            'gpu_count': 0
+            'cuda_available': caps['cuda'],
+            'gpu_count': caps['gpu_count']
         }
-        
-        try:
-            import torch
-            info['cuda_available'] = torch.cuda.is_available()
-            if torch.cuda.is_available():
-                info['gpu_count'] = torch.cuda.device_count()
-                info['gpu_name'] = torch.cuda.get_device_name(0)
-        except ImportError:
-            pass
-        
+
+        if caps['gpu_name']:
+            info['gpu_name'] = caps['gpu_name']
+
         return info
@@ -4,14 +4,62 @@ Analytics Dashboard Module
 Provides real-time analytics dashboard for monitoring store operations.
 """
 
+import functools
+import json
 import logging
+import threading
 import time
 from typing import Dict, Optional
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def _ttl_cache(seconds: float):
+    """
+    Cache a zero-argument method result per instance for a short TTL.
+
+    Collapses duplicate work when several dashboard clients poll the same
+    endpoint: the first caller computes under the instance lock, late
+    arrivals briefly block and get the cached result.
+    """
+    def decorator(method):
+        attr = f'_ttl_{method.__name__}'
+
+        @functools.wraps(method)
+        def wrapper(self):
+            cached = getattr(self, attr, None)
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < seconds:
+                return cached[1]
+
+            with self._cache_lock:
+                # Another caller may have computed while we waited
+                cached = getattr(self, attr, None)
+                now = time.monotonic()
+                if cached is not None and now - cached[0] < seconds:
+                    return cached[1]
+
+                result = method(self)
+                setattr(self, attr, (time.monotonic(), result))
+                return result
+
+        return wrapper
+    return decorator
+
+
 class AnalyticsDashboard:
     """
     Real-time analytics dashboard for store monitoring.
@@ -34,18 +82,38 @@ class AnalyticsDashboard:
         self.metrics_collector = metrics_collector
         self.session_manager = session_manager
         self.cart_manager = cart_manager
-        
+
+        # ISO timestamp recomputed at most once per second: dashboard
+        # refreshes don't need sub-second precision and the datetime
+        # format call shows up at high refresh rates
+        self._iso_second = 0
+        self._cached_iso = ''
+        self._cache_lock = threading.Lock()
+
         logger.info("AnalyticsDashboard initialized")
-    
+
+    @property
+    def _now_iso(self) -> str:
+        """ISO timestamp, cached per wall-clock second."""
+        second = int(time.time())
+        if second != self._iso_second:
+            self._iso_second = second
+            self._cached_iso = datetime.now().isoformat()
+        return self._cached_iso
+
+    @_ttl_cache(seconds=0.5)
     def get_dashboard_data(self) -> Dict:
         """
         Get complete dashboard data.
-        
+
+        Results are shared across callers for 500 ms, so N polling
+        clients cost one aggregation pass per refresh interval.
+
         Returns:
             Dictionary with all dashboard metrics
         """
         dashboard = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._now_iso,
             'revenue': self.metrics_collector.get_revenue_stats(hours=24),
             'occupancy': self.metrics_collector.get_occupancy_stats(),
             'popular_products': self.metrics_collector.get_product_popularity(limit=10)
@@ -61,8 +129,9 @@ class AnalyticsDashboard:
         
         return dashboard
     
+    @_ttl_cache(seconds=0.5)
     def get_realtime_stats(self) -> Dict:
-        """Get real-time statistics."""
+        """Get real-time statistics (shared across callers for 500 ms)."""
         return {
             'timestamp': time.time(),
             'revenue_1h': self.metrics_collector.get_revenue_stats(hours=1),
@@ -71,6 +140,26 @@ class AnalyticsDashboard:
             'top_products': self.metrics_collector.get_product_popularity(limit=5)
         }
     
+    def to_json(self) -> bytes:
+        """
+        Serialize dashboard data to JSON bytes for HTTP/WebSocket clients.
+
+        Uses orjson when installed (C implementation, handles numpy
+        scalars); falls back to stdlib json.
+        """
+        data = self.get_dashboard_data()
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+            )
+        return json.dumps(data).encode('utf-8')
+
+    def to_msgpack(self) -> bytes:
+        """Serialize dashboard data to MessagePack bytes for internal IPC."""
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack required. Install with: pip install msgpack")
+        return msgpack.packb(self.get_dashboard_data(), use_bin_type=True)
+
     def get_performance_metrics(self) -> Dict:
         """Get system performance metrics."""
         # This would integrate with system monitoring
@@ -4,32 +4,61 @@ Metrics Collection Module
 Collects and aggregates business metrics and analytics.
 """
 
+import heapq
 import logging
 import time
+import numpy as np
 from typing import Dict, List, Optional
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from operator import itemgetter
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class Metric:
-    """Represents a metric value."""
-    name: str
-    value: float
-    timestamp: float
-    tags: Dict[str, str] = None
-    
-    def __post_init__(self):
-        if self.tags is None:
-            self.tags = {}
+def _stats_since(name_id, val, ts, size, target, since):
+    """
+    Reduce (count, sum, min, max) over metrics matching one name.
+
+    Operates on the collector's struct-of-arrays storage so the whole
+    reduction is a single tight loop over primitive arrays instead of
+    attribute lookups on dataclass instances.
+    """
+    count = 0
+    total = 0.0
+    min_value = np.inf
+    max_value = -np.inf
+    for i in range(size):
+        if name_id[i] == target and ts[i] >= since:
+            v = val[i]
+            count += 1
+            total += v
+            if v < min_value:
+                min_value = v
+            if v > max_value:
+                max_value = v
+    return count, total, min_value, max_value
+
+
+if NUMBA_AVAILABLE:
+    _stats_since = numba.njit(cache=True)(_stats_since)
 
 
 class MetricsCollector:
     """
     Collects and aggregates metrics for analytics.
+
+    Raw metrics live in a struct-of-arrays ring buffer (parallel numpy
+    arrays for timestamp, value and interned name/product ids) rather
+    than a deque of per-metric objects, keeping the 100k-entry history
+    compact and every aggregation vectorizable.
     """
     
     def __init__(self, retention_days: int = 30):
@@ -40,9 +69,37 @@ class MetricsCollector:
             retention_days: Number of days to retain metrics
         """
         self.retention_days = retention_days
-        self.metrics: deque = deque(maxlen=100000)  # Limit memory usage
-        self.aggregated: Dict[str, List[float]] = defaultdict(list)
-        
+
+        # Per-name recent-value history as fixed numpy ring buffers
+        # [buf, head]: inserts are a single scalar assignment, with none
+        # of the reallocation spikes a growing list would pay
+        self._agg_cap = 10000
+        self._agg: Dict[str, list] = {}
+
+        # Per-name one-minute buckets [minute_epoch, count, sum, min, max].
+        # Stats queries walk these instead of scanning the raw metric deque,
+        # so a dashboard refresh is O(minutes in window), not O(total metrics).
+        self.buckets: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=retention_days * 1440)
+        )
+
+        # Running per-product detection counts for get_product_popularity
+        self.product_counts: Counter = Counter()
+
+        # Struct-of-arrays ring buffer for raw metrics: timestamp/value plus
+        # interned integer ids for the name and optional product tag.
+        # Exact-timestamp stats run as one (optionally numba-jitted) loop
+        # over these primitive arrays.
+        self._cap = 100000
+        self._ts = np.empty(self._cap, np.float64)
+        self._val = np.empty(self._cap, np.float32)
+        self._name_id = np.empty(self._cap, np.int32)
+        self._product_id = np.empty(self._cap, np.int32)  # -1 when untagged
+        self._head = 0
+        self._size = 0
+        self._name_ids: Dict[str, int] = {}
+        self._product_ids: Dict[str, int] = {}
+
         logger.info(f"MetricsCollector initialized (retention={retention_days} days)")
     
     def record_metric(
@@ -59,19 +116,44 @@ class MetricsCollector:
             value: Metric value
             tags: Optional tags for filtering
         """
-        metric = Metric(
-            name=name,
-            value=value,
-            timestamp=time.time(),
-            tags=tags or {}
+        timestamp = time.time()
+
+        # O(1) insert into the per-name ring buffer
+        entry = self._agg.get(name)
+        if entry is None:
+            entry = self._agg[name] = [np.empty(self._agg_cap, np.float32), 0]
+        buf, head = entry
+        buf[head % self._agg_cap] = value
+        entry[1] = head + 1
+
+        # Write into the SoA ring buffer
+        nid = self._name_ids.setdefault(name, len(self._name_ids))
+        product = tags.get('product') if tags else None
+        pid = (
+            self._product_ids.setdefault(product, len(self._product_ids))
+            if product is not None else -1
         )
-        
-        self.metrics.append(metric)
-        self.aggregated[name].append(value)
-        
-        # Keep only recent values (limit memory)
-        if len(self.aggregated[name]) > 10000:
-            self.aggregated[name] = self.aggregated[name][-5000:]
+        self._ts[self._head] = timestamp
+        self._val[self._head] = value
+        self._name_id[self._head] = nid
+        self._product_id[self._head] = pid
+        self._head = (self._head + 1) % self._cap
+        if self._size < self._cap:
+            self._size += 1
+
+        # Update the current one-minute bucket in place
+        minute = int(timestamp // 60)
+        buckets = self.buckets[name]
+        if buckets and buckets[-1][0] == minute:
+            bucket = buckets[-1]
+            bucket[1] += 1
+            bucket[2] += value
+            if value < bucket[3]:
+                bucket[3] = value
+            if value > bucket[4]:
+                bucket[4] = value
+        else:
+            buckets.append([minute, 1, value, value, value])
     
     def record_transaction(
         self,
@@ -105,9 +187,32 @@ class MetricsCollector:
         tags = {'product': product_name}
         if camera_id:
             tags['camera'] = camera_id
-        
+
+        self.product_counts[product_name] += 1
         self.record_metric('product.detection', confidence, tags)
     
+    def get_recent_values(self, metric_name: str) -> np.ndarray:
+        """
+        Get the most recent recorded values for a metric, oldest first.
+
+        Unrolls the per-name ring buffer without copying until it has
+        wrapped, then with one concatenate (no np.roll).
+
+        Args:
+            metric_name: Metric name
+
+        Returns:
+            Array of up to the last 10000 values (empty if unknown)
+        """
+        entry = self._agg.get(metric_name)
+        if entry is None:
+            return np.empty(0, np.float32)
+        buf, head = entry
+        if head <= self._agg_cap:
+            return buf[:head]
+        split = head % self._agg_cap
+        return np.concatenate((buf[split:], buf[:split]))
+
     def get_metric_stats(
         self,
         metric_name: str,
@@ -123,12 +228,42 @@ class MetricsCollector:
         Returns:
             Dictionary with statistics
         """
-        values = [
-            m.value for m in self.metrics
-            if m.name == metric_name and (since is None or m.timestamp >= since)
-        ]
-        
-        if not values:
+        # With numba, run the jitted reducer over the SoA arrays: exact
+        # timestamps and a single compiled loop instead of interpreter work
+        if NUMBA_AVAILABLE and metric_name in self._name_ids:
+            count, total, min_value, max_value = _stats_since(
+                self._name_id, self._val, self._ts, self._size,
+                self._name_ids[metric_name],
+                since if since is not None else -np.inf
+            )
+            if count == 0:
+                return {'count': 0, 'sum': 0.0, 'avg': 0.0, 'min': 0.0, 'max': 0.0}
+            return {
+                'count': int(count),
+                'sum': float(total),
+                'avg': float(total) / count,
+                'min': float(min_value),
+                'max': float(max_value)
+            }
+
+        # Walk the minute buckets from the newest end until we fall
+        # outside the requested window
+        count = 0
+        total = 0.0
+        min_value = float('inf')
+        max_value = float('-inf')
+
+        for bucket in reversed(self.buckets.get(metric_name, ())):
+            if since is not None and bucket[0] * 60 < since:
+                break
+            count += bucket[1]
+            total += bucket[2]
+            if bucket[3] < min_value:
+                min_value = bucket[3]
+            if bucket[4] > max_value:
+                max_value = bucket[4]
+
+        if count == 0:
             return {
                 'count': 0,
                 'sum': 0.0,
@@ -136,13 +271,13 @@ class MetricsCollector:
                 'min': 0.0,
                 'max': 0.0
             }
-        
+
         return {
-            'count': len(values),
-            'sum': sum(values),
-            'avg': sum(values) / len(values),
-            'min': min(values),
-            'max': max(values)
+            'count': count,
+            'sum': total,
+            'avg': total / count,
+            'min': min_value,
+            'max': max_value
         }
     
     def get_revenue_stats(self, hours: int = 24) -> Dict:
@@ -172,31 +307,31 @@ class MetricsCollector:
     
     def get_product_popularity(self, limit: int = 10) -> List[Dict]:
         """Get most popular products."""
-        product_counts = defaultdict(int)
-        
-        for metric in self.metrics:
-            if metric.name == 'product.detection' and 'product' in metric.tags:
-                product_name = metric.tags['product']
-                product_counts[product_name] += 1
-        
-        # Sort by count
-        sorted_products = sorted(
-            product_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:limit]
-        
+        top_products = heapq.nlargest(
+            limit,
+            self.product_counts.items(),
+            key=itemgetter(1)
+        )
+
         return [
             {'product': name, 'detections': count}
-            for name, count in sorted_products
+            for name, count in top_products
         ]
     
     def cleanup_old_metrics(self):
         """Remove metrics older than retention period."""
         cutoff_time = time.time() - (self.retention_days * 86400)
-        
-        # Remove old metrics
-        while self.metrics and self.metrics[0].timestamp < cutoff_time:
-            self.metrics.popleft()
-        
+
+        # Compact the ring buffer with one vectorized mask
+        if self._size:
+            keep = self._ts[:self._size] >= cutoff_time
+            kept = int(keep.sum())
+            if kept < self._size:
+                self._ts[:kept] = self._ts[:self._size][keep]
+                self._val[:kept] = self._val[:self._size][keep]
+                self._name_id[:kept] = self._name_id[:self._size][keep]
+                self._product_id[:kept] = self._product_id[:self._size][keep]
+                self._size = kept
+                self._head = kept % self._cap
+
         logger.debug(f"Cleaned up metrics older than {self.retention_days} days")
@@ -0,0 +1,65 @@
+"""
+Fast Numeric Kernels Module
+
+Numba-compiled helpers for per-frame hot loops, with pure-NumPy
+fallbacks when numba is not installed.
+"""
+
+import logging
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def cart_total(qty, price, n):
+        """
+        Dot product over the first n cart rows.
+
+        Compiled plain loop: for the small carts that dominate
+        (a handful of rows), np.dot's per-call dispatch overhead
+        exceeds the arithmetic itself.
+        """
+        total = 0.0
+        for i in range(n):
+            total += qty[i] * price[i]
+        return total
+
+    @njit(cache=True, boundscheck=False)
+    def filter_detections(scores, threshold):
+        """
+        Return the indices of scores at or above threshold.
+
+        Compiled single pass; no temporary boolean mask is allocated.
+        """
+        n = scores.shape[0]
+        out = np.empty(n, np.int64)
+        k = 0
+        for i in range(n):
+            if scores[i] >= threshold:
+                out[k] = i
+                k += 1
+        return out[:k]
+else:
+    def cart_total(qty, price, n):
+        """
+        Dot product over the first n cart rows.
+
+        NumPy fallback used when numba is not installed.
+        """
+        return float(np.dot(qty[:n], price[:n]))
+
+    def filter_detections(scores, threshold):
+        """
+        Return the indices of scores at or above threshold.
+
+        NumPy fallback used when numba is not installed.
+        """
+        return np.nonzero(scores >= threshold)[0]
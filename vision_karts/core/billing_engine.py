@@ -4,13 +4,18 @@ Billing Engine Module
 Calculates total bill amount based on detected products using price database.
 """
 
-import pandas as pd
+import csv
 import logging
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Process-wide price table cache keyed by (path, mtime) so repeated
+# BillingEngine construction does not re-parse the same CSV
+_prices_cache: Dict[Tuple[str, float], Dict[str, float]] = {}
+
 
 class BillingEngine:
     """
@@ -25,16 +30,28 @@ class BillingEngine:
             price_file: Path to CSV file with product prices.
                        Format: product_name,price
         """
-        if not Path(price_file).exists():
+        price_path = Path(price_file)
+        if not price_path.exists():
             raise FileNotFoundError(f"Price file not found: {price_file}")
-        
-        self.price_df = pd.read_csv(price_file, header=None, names=['product', 'price'])
-        self.price_dict = dict(zip(
-            self.price_df['product'].str.lower(),
-            self.price_df['price']
-        ))
-        
-        logger.info(f"Loaded {len(self.price_dict)} products from price database")
+
+        cache_key = (str(price_path), price_path.stat().st_mtime)
+        if cache_key in _prices_cache:
+            self.price_dict = _prices_cache[cache_key]
+            logger.debug("Using cached price table for %s", price_file)
+        else:
+            self.price_dict = {}
+            with open(price_path, 'r', newline='') as f:
+                for row in csv.reader(f):
+                    if len(row) >= 2:
+                        self.price_dict[row[0].lower()] = float(row[1])
+            _prices_cache[cache_key] = self.price_dict
+
+        # Original-case class name -> price, filled lazily: detection
+        # class names repeat constantly, so each one pays str.lower()
+        # exactly once
+        self._price_cache: Dict[str, float] = {}
+
+        logger.info("Loaded %d products from price database", len(self.price_dict))
     
     def calculate_price(self, product_name: str) -> float:
         """
@@ -46,13 +63,14 @@ class BillingEngine:
         Returns:
             Price as float, or 0.0 if product not found
         """
-        product_key = product_name.lower()
-        price = self.price_dict.get(product_key, 0.0)
-        
-        if price == 0.0:
-            logger.warning(f"Product '{product_name}' not found in price database")
-        
-        return float(price)
+        price = self.price_dict.get(product_name.lower(), 0.0)
+
+        # Debug level: formatting a warning per unknown product is
+        # measurable in the per-frame billing path
+        if price == 0.0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Product '%s' not found in price database", product_name)
+
+        return price
     
     def generate_bill(
         self,
@@ -76,31 +94,32 @@ class BillingEngine:
         """
         items = []
         total = 0.0
-        
-        # Count products and calculate prices
-        product_counts = {}
+
+        # One pass to count products and accumulate confidences
+        counts = Counter(d['class_name'] for d in detections)
+        confidence_sums: Dict[str, float] = {}
         for detection in detections:
-            product_name = detection['class_name']
-            if product_name not in product_counts:
-                product_counts[product_name] = {
-                    'count': 0,
-                    'price': self.calculate_price(product_name),
-                    'confidence': []
-                }
-            product_counts[product_name]['count'] += 1
-            product_counts[product_name]['confidence'].append(detection['confidence'])
-        
-        # Build item list
-        for product_name, info in product_counts.items():
-            item_total = info['price'] * info['count']
-            avg_confidence = sum(info['confidence']) / len(info['confidence'])
-            
+            name = detection['class_name']
+            confidence_sums[name] = confidence_sums.get(name, 0.0) + detection['confidence']
+
+        # Build item list with one inlined dict lookup per distinct
+        # product (no per-product function call); the original-case
+        # cache skips re-lowercasing names seen before
+        price_cache = self._price_cache
+        for product_name, count in counts.items():
+            price = price_cache.get(product_name)
+            if price is None:
+                price = price_cache.setdefault(
+                    product_name, self.price_dict.get(product_name.lower(), 0.0)
+                )
+            item_total = price * count
+
             items.append({
                 'product': product_name,
-                'quantity': info['count'],
-                'unit_price': info['price'],
+                'quantity': count,
+                'unit_price': price,
                 'total': item_total,
-                'avg_confidence': avg_confidence
+                'avg_confidence': confidence_sums[product_name] / count
             })
             total += item_total
         
@@ -109,9 +128,9 @@ class BillingEngine:
             'items': items,
             'subtotal': total,
             'total': round(total, 2),
-            'item_count': sum(item['quantity'] for item in items)
+            'item_count': len(detections)
         }
-        
+
         return bill
     
     def format_bill(self, bill: Dict) -> str:
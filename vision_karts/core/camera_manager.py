@@ -8,6 +8,7 @@ import cv2
 import numpy as np
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Callable
 from pathlib import Path
 import time
@@ -42,10 +43,17 @@ class CameraManager:
         self.cameras_config = cameras
         self.frame_processor = frame_processor
         self.sync_mode = sync_mode
+
+        # Camera-id -> name map built once: the per-frame callback does
+        # an O(1) dict lookup instead of scanning the config list
+        self._name_by_id = {
+            str(c.get('id', '')): c.get('name', 'Unknown') for c in cameras
+        }
         
         self.video_processors: Dict[str, VideoProcessor] = {}
         self.running = False
         self.frame_callbacks: Dict[str, Callable] = {}
+        self._frame_pool: Optional[ThreadPoolExecutor] = None
         
         logger.info(f"CameraManager initialized with {len(cameras)} cameras")
     
@@ -76,6 +84,9 @@ class CameraManager:
         
         self.video_processors[camera_id] = processor
         self.frame_callbacks[camera_id] = frame_callback
+        self._name_by_id.setdefault(
+            str(camera_id), camera_config.get('name', 'Unknown')
+        )
         
         logger.info(f"Added camera {camera_id} ({camera_config.get('name', 'Unnamed')})")
     
@@ -98,19 +109,20 @@ class CameraManager:
                 # Setup processing callback if frame processor available
                 if self.frame_processor:
                     def make_callback(cam_id):
+                        # Resolve per-frame constants once at closure
+                        # creation instead of on every frame
+                        cam_name = self._name_by_id.get(str(cam_id), 'Unknown')
+                        custom_callback = self.frame_callbacks.get(cam_id)
+
                         def callback(frame, timestamp):
                             results = self.frame_processor.process_frame(frame, timestamp)
                             results['camera_id'] = cam_id
-                            results['camera_name'] = next(
-                                (c.get('name', '') for c in self.cameras_config 
-                                 if str(c.get('id', '')) == str(cam_id)),
-                                'Unknown'
-                            )
-                            
+                            results['camera_name'] = cam_name
+
                             # Call custom callback if set
-                            if cam_id in self.frame_callbacks and self.frame_callbacks[cam_id]:
-                                self.frame_callbacks[cam_id](results, cam_id, timestamp)
-                            
+                            if custom_callback:
+                                custom_callback(results, cam_id, timestamp)
+
                             return results
                         return callback
                     
@@ -135,6 +147,9 @@ class CameraManager:
                 logger.error(f"Error stopping camera {camera_id}: {e}")
         
         self.video_processors.clear()
+        if self._frame_pool is not None:
+            self._frame_pool.shutdown(wait=False)
+            self._frame_pool = None
         logger.info("All cameras stopped")
     
     def get_frame(self, camera_id: str, timeout: float = 1.0):
@@ -164,12 +179,35 @@ class CameraManager:
         Returns:
             Dictionary mapping camera_id to (frame, timestamp)
         """
+        camera_ids = list(self.video_processors)
+        if len(camera_ids) <= 1:
+            frames = {}
+            for camera_id in camera_ids:
+                frame_data = self.get_frame(camera_id, timeout)
+                if frame_data:
+                    frames[camera_id] = frame_data
+            return frames
+
+        # Overlap the per-camera queue waits on a reused thread pool so
+        # the total wait is bounded by one timeout, not C timeouts
+        if self._frame_pool is None or self._frame_pool._max_workers < len(camera_ids):
+            if self._frame_pool is not None:
+                self._frame_pool.shutdown(wait=False)
+            self._frame_pool = ThreadPoolExecutor(
+                max_workers=len(camera_ids), thread_name_prefix='vk-frames'
+            )
+
+        futures = {
+            camera_id: self._frame_pool.submit(self.get_frame, camera_id, timeout)
+            for camera_id in camera_ids
+        }
+
         frames = {}
-        for camera_id in self.video_processors:
-            frame_data = self.get_frame(camera_id, timeout)
+        for camera_id, future in futures.items():
+            frame_data = future.result()
             if frame_data:
                 frames[camera_id] = frame_data
-        
+
         return frames
     
     def get_camera_stats(self) -> Dict[str, Dict]:
@@ -184,7 +222,9 @@ class CameraManager:
             stats[camera_id] = {
                 'fps': processor.get_current_fps(),
                 'frame_count': processor.frame_count,
-                'queue_size': processor.frame_queue.qsize()
+                # Approximate counter: avoids taking the queue mutex
+                # from the telemetry path
+                'queue_size': max(processor._approx_qsize, 0)
             }
         
         return stats
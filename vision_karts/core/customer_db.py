@@ -6,15 +6,34 @@ Manages customer accounts, profiles, and payment information.
 
 import logging
 import json
+import sqlite3
+import sys
+import threading
 from typing import Dict, Optional, List
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# slots=True drops the per-instance __dict__ (~40-50% less memory per
+# profile, faster attribute access); only available from Python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class CustomerProfile:
     """Customer profile information."""
     customer_id: str
@@ -25,57 +44,129 @@ class CustomerProfile:
     payment_token: Optional[str] = None  # Encrypted payment info
     created_at: str = None
     last_visit: Optional[str] = None
-    
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now().isoformat()
 
 
+def _dumps(data: Dict) -> bytes:
+    """
+    Serialize a profile dict to bytes.
+
+    Prefers MessagePack (~2-3x faster to parse than JSON and ~30%
+    smaller on disk), then orjson, then stdlib json.
+    """
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(data, use_bin_type=True)
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Dict:
+    """Deserialize profile bytes written by any _dumps format."""
+    # MessagePack payloads for a dict never start with '{', so JSON
+    # rows written before the format switch still load
+    if MSGPACK_AVAILABLE and raw[:1] != b'{':
+        return msgpack.unpackb(raw, raw=False)
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class CustomerDB:
     """
-    Simple file-based customer database (can be replaced with SQL database).
+    SQLite-backed customer database.
+
+    Profiles live in a ``customers(customer_id PRIMARY KEY, data BLOB)``
+    table with WAL journaling, so mutations are O(1) indexed writes and
+    readers never block on writers — unlike the previous whole-file JSON
+    store that was rewritten on every update. Hot rows are cached in
+    memory; an existing ``customers.json`` is migrated on first open.
     """
-    
-    def __init__(self, db_path: str = "data/customers.json"):
+
+    def __init__(self, db_path: str = "data/customers.db"):
         """
         Initialize customer database.
-        
+
         Args:
-            db_path: Path to JSON database file
+            db_path: Path to the SQLite database file (a legacy .json
+                path is accepted and mapped to a sibling .db file)
         """
-        self.db_path = Path(db_path)
+        path = Path(db_path)
+        if path.suffix == '.json':
+            legacy_json = path
+            path = path.with_suffix('.db')
+        else:
+            legacy_json = path.with_suffix('.json')
+        self.db_path = path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        self.customers: Dict[str, CustomerProfile] = {}
-        self._load_database()
-        
-        logger.info(f"CustomerDB initialized ({len(self.customers)} customers)")
-    
-    def _load_database(self):
-        """Load customer database from file."""
-        if self.db_path.exists():
-            try:
-                with open(self.db_path, 'r') as f:
-                    data = json.load(f)
-                    for customer_id, profile_data in data.items():
-                        self.customers[customer_id] = CustomerProfile(**profile_data)
-                logger.info(f"Loaded {len(self.customers)} customers from database")
-            except Exception as e:
-                logger.error(f"Error loading database: {e}", exc_info=True)
-    
-    def _save_database(self):
-        """Save customer database to file."""
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS customers ("
+            "customer_id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+        # Hot-row cache: avoids a SELECT + deserialize per repeated lookup
+        self._cache: Dict[str, CustomerProfile] = {}
+
+        self._migrate_legacy_json(legacy_json)
+
+        logger.info(f"CustomerDB initialized ({self._count()} customers)")
+
+    def _count(self) -> int:
+        """Number of stored customers."""
+        return self._conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def _migrate_legacy_json(self, legacy_json: Path):
+        """Import a pre-SQLite customers.json snapshot if one exists."""
+        if not legacy_json.exists() or self._count():
+            return
         try:
-            data = {
-                customer_id: asdict(profile)
-                for customer_id, profile in self.customers.items()
-            }
-            with open(self.db_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug("Database saved")
+            data = _loads(legacy_json.read_bytes())
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO customers (customer_id, data) VALUES (?, ?)",
+                    [(cid, _dumps(profile)) for cid, profile in data.items()]
+                )
+                self._conn.commit()
+            logger.info(f"Migrated {len(data)} customers from {legacy_json}")
         except Exception as e:
-            logger.error(f"Error saving database: {e}", exc_info=True)
-    
+            logger.error(f"Error migrating legacy database: {e}", exc_info=True)
+
+    def _fetch(self, customer_id: str) -> Optional[CustomerProfile]:
+        """Fetch a profile by id, through the hot-row cache."""
+        profile = self._cache.get(customer_id)
+        if profile is not None:
+            return profile
+
+        row = self._conn.execute(
+            "SELECT data FROM customers WHERE customer_id = ?", (customer_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        profile = CustomerProfile(**_loads(row[0]))
+        self._cache[customer_id] = profile
+        return profile
+
+    def _store(self, profile: CustomerProfile):
+        """Upsert a profile row and refresh the cache."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO customers (customer_id, data) VALUES (?, ?) "
+                "ON CONFLICT(customer_id) DO UPDATE SET data = excluded.data",
+                (profile.customer_id, _dumps(asdict(profile)))
+            )
+            self._conn.commit()
+        self._cache[profile.customer_id] = profile
+
     def register_customer(
         self,
         customer_id: str,
@@ -85,37 +176,36 @@ class CustomerDB:
     ) -> CustomerProfile:
         """
         Register a new customer.
-        
+
         Args:
             customer_id: Unique customer identifier
             name: Customer name
             email: Email address
             phone: Phone number
-        
+
         Returns:
             CustomerProfile instance
         """
-        if customer_id in self.customers:
+        existing = self._fetch(customer_id)
+        if existing is not None:
             logger.warning(f"Customer {customer_id} already exists")
-            return self.customers[customer_id]
-        
+            return existing
+
         profile = CustomerProfile(
             customer_id=customer_id,
             name=name,
             email=email,
             phone=phone
         )
-        
-        self.customers[customer_id] = profile
-        self._save_database()
-        
+        self._store(profile)
+
         logger.info(f"Registered customer {customer_id}")
         return profile
-    
+
     def get_customer(self, customer_id: str) -> Optional[CustomerProfile]:
         """Get customer profile."""
-        return self.customers.get(customer_id)
-    
+        return self._fetch(customer_id)
+
     def update_customer(
         self,
         customer_id: str,
@@ -123,29 +213,29 @@ class CustomerDB:
     ) -> Optional[CustomerProfile]:
         """
         Update customer profile.
-        
+
         Args:
             customer_id: Customer identifier
             **updates: Fields to update
-        
+
         Returns:
             Updated CustomerProfile or None
         """
-        profile = self.get_customer(customer_id)
+        profile = self._fetch(customer_id)
         if not profile:
             logger.warning(f"Customer {customer_id} not found")
             return None
-        
+
         for key, value in updates.items():
             if hasattr(profile, key):
                 setattr(profile, key, value)
-        
+
         profile.last_visit = datetime.now().isoformat()
-        self._save_database()
-        
+        self._store(profile)
+
         logger.info(f"Updated customer {customer_id}")
         return profile
-    
+
     def set_payment_method(
         self,
         customer_id: str,
@@ -158,14 +248,45 @@ class CustomerDB:
             payment_method=payment_method,
             payment_token=payment_token
         )
-    
+
     def get_all_customers(self) -> List[CustomerProfile]:
         """Get all customers."""
-        return list(self.customers.values())
-    
+        rows = self._conn.execute("SELECT data FROM customers").fetchall()
+        return [CustomerProfile(**_loads(row[0])) for row in rows]
+
     def delete_customer(self, customer_id: str):
         """Delete customer from database."""
-        if customer_id in self.customers:
-            del self.customers[customer_id]
-            self._save_database()
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM customers WHERE customer_id = ?", (customer_id,)
+            ).rowcount
+            self._conn.commit()
+        self._cache.pop(customer_id, None)
+        if deleted:
             logger.info(f"Deleted customer {customer_id}")
+
+    def export_json(self, export_path: str) -> Path:
+        """
+        Export all profiles as indented JSON for human inspection.
+
+        Args:
+            export_path: Destination .json file path
+
+        Returns:
+            Path the export was written to
+        """
+        data = {
+            profile.customer_id: asdict(profile)
+            for profile in self.get_all_customers()
+        }
+        path = Path(export_path)
+        if ORJSON_AVAILABLE:
+            path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            path.write_bytes(json.dumps(data, indent=2).encode('utf-8'))
+        logger.info(f"Exported {len(data)} customers to {path}")
+        return path
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
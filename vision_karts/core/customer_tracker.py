@@ -7,6 +7,7 @@ Tracks and identifies customers using modern face recognition technology.
 import cv2
 import numpy as np
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import pickle
@@ -18,79 +19,415 @@ except ImportError:
     FACE_RECOGNITION_AVAILABLE = False
     logging.warning("face_recognition not available. Install with: pip install face-recognition")
 
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# ArcFace-style embedding models take aligned 112x112 RGB crops
+ARCFACE_INPUT_SIZE = 112
+
+# Gallery sizes below this encode serially: worker startup would cost
+# more than the parallel speedup
+_PARALLEL_ENCODE_MIN = 8
+
+
+def _encode_face_file(image_path: Path) -> Tuple[str, Optional[np.ndarray]]:
+    """
+    Worker: decode one gallery image and encode its first face.
+
+    Module-level so ProcessPoolExecutor can pickle it; returns (id, None)
+    when no face is found or the file cannot be read.
+    """
+    try:
+        image = face_recognition.load_image_file(str(image_path))
+        encodings = face_recognition.face_encodings(image)
+        if encodings:
+            return image_path.stem, encodings[0]
+    except Exception as e:
+        logger.warning(f"Failed to load face from {image_path}: {e}")
+    return image_path.stem, None
+
 
 class CustomerTracker:
     """
     Customer tracking and identification using face recognition.
-    
-    Uses dlib's face recognition model (HOG-based) for efficient real-time tracking.
+
+    Two backends are supported:
+    - ONNX ArcFace embeddings + FAISS nearest-neighbor search (preferred):
+      one vectorized index lookup per face instead of a Python-level
+      compare against every known customer, and no dlib dependency.
+    - dlib via face_recognition (fallback when no embedding model is given).
     """
-    
-    def __init__(self, known_faces_dir: Optional[str] = None):
+
+    def __init__(
+        self,
+        known_faces_dir: Optional[str] = None,
+        embedding_model_path: Optional[str] = None,
+        downscale: float = 0.5
+    ):
         """
         Initialize customer tracker.
-        
+
         Args:
             known_faces_dir: Directory containing known customer face images.
                            Each image should be named with customer ID.
+            embedding_model_path: Optional path to an ONNX ArcFace/InsightFace
+                           embedding model. When provided (and onnxruntime is
+                           installed), recognition runs through ONNX + FAISS
+                           instead of dlib.
+            downscale: Factor frames are shrunk by before face detection
+                           (detection cost scales with pixel count; crops
+                           for encoding are still taken at full resolution).
+                           Use 1.0 to disable.
         """
-        if not FACE_RECOGNITION_AVAILABLE:
+        self.downscale = downscale
+        self.known_encodings = {}
+        self.known_names = []
+
+        # Stacked float32 gallery matrix (N, D) aligned with known_names,
+        # rebuilt only when the gallery changes, so per-frame matching is
+        # one vectorized reduction instead of list rebuilds per call
+        self._known_matrix: Optional[np.ndarray] = None
+        self._known_sq: Optional[np.ndarray] = None
+        self._dlib_index = None
+
+        # ONNX + FAISS backend state
+        self.ort_session = None
+        self.face_index = None
+        self._haar_cascade = None
+
+        if embedding_model_path and ONNX_AVAILABLE and Path(embedding_model_path).exists():
+            providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
+            self.ort_session = ort.InferenceSession(
+                str(embedding_model_path), providers=providers
+            )
+            self._ort_input_name = self.ort_session.get_inputs()[0].name
+            logger.info(f"Using ONNX embedding model: {embedding_model_path}")
+
+        if self.ort_session is None and not FACE_RECOGNITION_AVAILABLE:
             raise ImportError(
                 "face_recognition library required. "
-                "Install with: pip install face-recognition"
+                "Install with: pip install face-recognition "
+                "(or provide an ONNX embedding model)"
             )
-        
-        self.known_encodings = {}
-        self.known_names = []
-        
+
         if known_faces_dir and Path(known_faces_dir).exists():
             self._load_known_faces(known_faces_dir)
-        
-        logger.info(f"CustomerTracker initialized with {len(self.known_encodings)} known faces")
-    
+
+        logger.info(f"CustomerTracker initialized with {len(self.known_names)} known faces")
+
+    # ------------------------------------------------------------------
+    # Gallery loading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _gallery_images(faces_path: Path) -> List[Path]:
+        """Known-face image files in a directory, sorted by name."""
+        images = []
+        for pattern in ("*.jpg", "*.jpeg", "*.png"):
+            images.extend(faces_path.glob(pattern))
+        return sorted(images)
+
     def _load_known_faces(self, faces_dir: str):
         """Load known face encodings from directory."""
+        if self.ort_session is not None:
+            self._load_known_faces_onnx(faces_dir)
+            return
+
         faces_path = Path(faces_dir)
-        
-        for image_path in faces_path.glob("*.jpg"):
+        image_paths = self._gallery_images(faces_path)
+        cache_path = faces_path / "encodings.npz"
+
+        # Reuse the cached encoding matrix unless any gallery image is
+        # newer: re-encoding every face dominates cold start otherwise
+        if cache_path.exists() and image_paths:
+            cache_mtime = cache_path.stat().st_mtime
+            if cache_mtime >= max(p.stat().st_mtime for p in image_paths):
+                try:
+                    cached = np.load(cache_path, allow_pickle=True)
+                    self.known_names = [str(name) for name in cached['ids']]
+                    for name, encoding in zip(self.known_names, cached['enc']):
+                        self.known_encodings[name] = encoding
+                    self._rebuild_known_matrix()
+                    logger.info(
+                        f"Loaded {len(self.known_names)} cached face encodings"
+                    )
+                    return
+                except Exception as e:
+                    logger.warning(f"Failed to load encoding cache, rebuilding: {e}")
+
+        # Cold build: decode + encode is CPU-bound and trivially
+        # parallel per file, so larger galleries fan out over a process
+        # pool; the .npz cache means this only runs when images changed
+        if len(image_paths) >= _PARALLEL_ENCODE_MIN:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(_encode_face_file, image_paths))
+        else:
+            results = [_encode_face_file(path) for path in image_paths]
+
+        for customer_id, encoding in results:
+            if encoding is not None:
+                self.known_encodings[customer_id] = encoding
+                self.known_names.append(customer_id)
+                logger.debug(f"Loaded face encoding for {customer_id}")
+
+        self._rebuild_known_matrix()
+
+        if self.known_names:
+            try:
+                np.savez(
+                    cache_path,
+                    ids=np.array(self.known_names, dtype=object),
+                    enc=self._known_matrix
+                )
+            except Exception as e:
+                logger.warning(f"Failed to persist encoding cache: {e}")
+
+    def _rebuild_known_matrix(self):
+        """Restack the gallery into one float32 matrix after changes."""
+        if self.known_names:
+            # float16 storage halves the bytes the nearest-neighbor scan
+            # moves per comparison; arithmetic still promotes to float32,
+            # and at tolerance 0.6 the precision loss is negligible
+            self._known_matrix = np.stack(
+                [self.known_encodings[name] for name in self.known_names]
+            ).astype(np.float16)
+            # Cached squared norms let batched matching expand
+            # ||p - k||^2 = ||p||^2 + ||k||^2 - 2 p.k around one GEMM
+            matrix32 = self._known_matrix.astype(np.float32)
+            self._known_sq = (matrix32 ** 2).sum(axis=1)
+
+            # FAISS index over the gallery: exact flat L2 for small
+            # galleries, HNSW once a linear scan would dominate
+            self._dlib_index = None
+            if FAISS_AVAILABLE:
+                dim = matrix32.shape[1]
+                if len(self.known_names) > 1000:
+                    self._dlib_index = faiss.IndexHNSWFlat(dim, 32)
+                else:
+                    self._dlib_index = faiss.IndexFlatL2(dim)
+                self._dlib_index.add(np.ascontiguousarray(matrix32))
+        else:
+            self._known_matrix = None
+            self._known_sq = None
+            self._dlib_index = None
+
+    def _load_known_faces_onnx(self, faces_dir: str):
+        """Build (or load) the FAISS gallery index from known face images."""
+        faces_path = Path(faces_dir)
+        image_paths = self._gallery_images(faces_path)
+        index_path = faces_path / "customers.index"
+        ids_path = faces_path / "ids.npy"
+
+        # Reuse the persisted index unless any gallery image is newer:
+        # embedding the whole gallery is the expensive part of startup,
+        # but a stale index would ignore added or replaced photos
+        if (FAISS_AVAILABLE and index_path.exists() and ids_path.exists()
+                and image_paths):
+            cache_mtime = min(index_path.stat().st_mtime, ids_path.stat().st_mtime)
+            if cache_mtime >= max(p.stat().st_mtime for p in image_paths):
+                try:
+                    self.face_index = faiss.read_index(str(index_path))
+                    self.known_names = list(np.load(ids_path, allow_pickle=True))
+                    logger.info(f"Loaded gallery index ({len(self.known_names)} customers)")
+                    return
+                except Exception as e:
+                    logger.warning(f"Failed to load gallery index, rebuilding: {e}")
+
+        embeddings = []
+        names = []
+        for image_path in image_paths:
             customer_id = image_path.stem
             try:
-                image = face_recognition.load_image_file(str(image_path))
-                encodings = face_recognition.face_encodings(image)
-                
-                if encodings:
-                    self.known_encodings[customer_id] = encodings[0]
-                    self.known_names.append(customer_id)
-                    logger.debug(f"Loaded face encoding for {customer_id}")
+                image = cv2.imread(str(image_path))
+                if image is None:
+                    continue
+                rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                locations = self._detect_face_locations(rgb_image)
+                if not locations:
+                    logger.warning(f"No face found in {image_path}")
+                    continue
+                crop = self._crop_face(rgb_image, locations[0])
+                embeddings.append(crop)
+                names.append(customer_id)
             except Exception as e:
                 logger.warning(f"Failed to load face from {image_path}: {e}")
-    
+
+        if not embeddings:
+            return
+
+        gallery = self._embed_faces(embeddings)
+        self.known_names = names
+        for customer_id, embedding in zip(names, gallery):
+            self.known_encodings[customer_id] = embedding
+
+        if FAISS_AVAILABLE:
+            self.face_index = faiss.IndexFlatIP(gallery.shape[1])
+            self.face_index.add(gallery)
+            try:
+                faiss.write_index(self.face_index, str(index_path))
+                np.save(ids_path, np.array(names, dtype=object))
+            except Exception as e:
+                logger.warning(f"Failed to persist gallery index: {e}")
+        else:
+            logger.warning("FAISS not available, falling back to matrix compare")
+
+    # ------------------------------------------------------------------
+    # ONNX embedding helpers
+    # ------------------------------------------------------------------
+
+    def _detect_face_locations(self, rgb_image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Detect face locations as (top, right, bottom, left) boxes."""
+        if FACE_RECOGNITION_AVAILABLE:
+            return face_recognition.face_locations(rgb_image)
+
+        # Dependency-light fallback: OpenCV Haar cascade
+        if self._haar_cascade is None:
+            cascade_path = Path(cv2.data.haarcascades) / "haarcascade_frontalface_default.xml"
+            self._haar_cascade = cv2.CascadeClassifier(str(cascade_path))
+
+        gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+        faces = self._haar_cascade.detectMultiScale(gray, 1.1, 5)
+        return [(y, x + w, y + h, x) for (x, y, w, h) in faces]
+
+    def _locate_faces_downscaled(self, rgb_image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Detect face locations on a shrunken frame, scaled back to full size.
+
+        Sliding-window detection cost scales with pixel count, so the
+        default 0.5 downscale makes location ~4x faster; encodings are
+        still computed from the full-resolution frame for quality.
+        """
+        if self.downscale >= 1.0:
+            if FACE_RECOGNITION_AVAILABLE and self.ort_session is None:
+                return face_recognition.face_locations(rgb_image)
+            return self._detect_face_locations(rgb_image)
+
+        small = cv2.resize(
+            rgb_image, (0, 0), fx=self.downscale, fy=self.downscale
+        )
+        if FACE_RECOGNITION_AVAILABLE and self.ort_session is None:
+            locations = face_recognition.face_locations(
+                small, model='hog', number_of_times_to_upsample=0
+            )
+        else:
+            locations = self._detect_face_locations(small)
+
+        inv = 1.0 / self.downscale
+        return [
+            (int(top * inv), int(right * inv), int(bottom * inv), int(left * inv))
+            for top, right, bottom, left in locations
+        ]
+
+    @staticmethod
+    def _crop_face(rgb_image: np.ndarray, location: Tuple[int, int, int, int]) -> np.ndarray:
+        """Crop and resize a face region to the embedding input size."""
+        top, right, bottom, left = location
+        crop = rgb_image[max(top, 0):bottom, max(left, 0):right]
+        return cv2.resize(crop, (ARCFACE_INPUT_SIZE, ARCFACE_INPUT_SIZE))
+
+    def _embed_faces(self, crops: List[np.ndarray]) -> np.ndarray:
+        """
+        Embed a batch of face crops with one ONNX session call.
+
+        Args:
+            crops: List of (112, 112, 3) RGB uint8 face crops
+
+        Returns:
+            L2-normalized float32 embedding matrix of shape (K, D)
+        """
+        batch = np.stack(crops).astype(np.float32)
+        batch = (batch - 127.5) / 128.0
+        batch = batch.transpose(0, 3, 1, 2)  # NHWC -> NCHW
+
+        embeddings = self.ort_session.run(None, {self._ort_input_name: batch})[0]
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    # ------------------------------------------------------------------
+    # Detection / identification
+    # ------------------------------------------------------------------
+
     def detect_faces(self, image: np.ndarray) -> List[Dict]:
         """
         Detect all faces in an image.
-        
+
         Args:
             image: Input image (RGB format)
-        
+
         Returns:
             List of face detection dictionaries with:
                 - 'location': (top, right, bottom, left)
                 - 'encoding': face encoding array
         """
-        face_locations = face_recognition.face_locations(image)
+        locations = self._locate_faces_downscaled(image)
+
+        if self.ort_session is not None:
+            if not locations:
+                return []
+            crops = [self._crop_face(image, loc) for loc in locations]
+            encodings = self._embed_faces(crops)
+            return [
+                {'location': loc, 'encoding': enc}
+                for loc, enc in zip(locations, encodings)
+            ]
+
+        face_locations = locations
         face_encodings = face_recognition.face_encodings(image, face_locations)
-        
+
         detections = []
         for location, encoding in zip(face_locations, face_encodings):
             detections.append({
                 'location': location,
                 'encoding': encoding
             })
-        
+
         return detections
-    
+
+    def _search_gallery(self, face_encoding: np.ndarray) -> Tuple[Optional[str], float]:
+        """Nearest-neighbor search of an ONNX embedding against the gallery."""
+        ids, similarities = self._search_gallery_batch(
+            face_encoding.reshape(1, -1)
+        )
+        return ids[0], float(similarities[0])
+
+    def _search_gallery_batch(self, probes: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Search F ONNX embeddings against the gallery in one call.
+
+        Args:
+            probes: (F, D) embedding matrix (already L2-normalized)
+
+        Returns:
+            Tuple of (best-match ids, cosine similarities)
+        """
+        probes = np.ascontiguousarray(probes, dtype=np.float32)
+
+        if self.face_index is not None:
+            similarities, indices = self.face_index.search(probes, 1)
+            ids = [self.known_names[int(i)] for i in indices[:, 0]]
+            return ids, similarities[:, 0]
+
+        # No FAISS: one (F, D) x (D, N) matmul against the stacked gallery
+        gallery = np.stack([self.known_encodings[n] for n in self.known_names])
+        similarities = probes @ gallery.T
+        best = similarities.argmax(axis=1)
+        ids = [self.known_names[int(i)] for i in best]
+        return ids, similarities[np.arange(len(probes)), best]
+
     def identify_customer(
         self,
         face_encoding: np.ndarray,
@@ -98,43 +435,82 @@ class CustomerTracker:
     ) -> Optional[str]:
         """
         Identify a customer from face encoding.
-        
+
         Args:
             face_encoding: Face encoding from detect_faces()
             tolerance: Matching tolerance (lower = stricter)
-        
+
         Returns:
             Customer ID if match found, None otherwise
         """
-        if not self.known_encodings:
+        if not self.known_names:
+            return None
+
+        if self.ort_session is not None:
+            customer_id, similarity = self._search_gallery(face_encoding)
+            # Cosine similarity threshold mirrors the distance tolerance
+            if similarity >= 1.0 - tolerance:
+                return customer_id
             return None
-        
-        # Compare with known faces
-        matches = face_recognition.compare_faces(
-            list(self.known_encodings.values()),
-            face_encoding,
-            tolerance=tolerance
+
+        # One vectorized distance reduction over the cached gallery
+        # matrix replaces the separate compare_faces + face_distance
+        # passes (each of which restacked the encodings)
+        customer_id, distance = self._match_dlib(face_encoding)
+        if distance <= tolerance:
+            return customer_id
+        return None
+
+    def _match_dlib(self, face_encoding: np.ndarray) -> Tuple[Optional[str], float]:
+        """Nearest gallery entry for a dlib encoding as (id, distance)."""
+        ids, distances = self._match_dlib_batch(
+            face_encoding.reshape(1, -1).astype(np.float32)
         )
-        
-        face_distances = face_recognition.face_distance(
-            list(self.known_encodings.values()),
-            face_encoding
+        return ids[0], float(distances[0])
+
+    def _match_dlib_batch(self, probes: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """
+        Match F probe encodings against the gallery with one GEMM.
+
+        Expands the squared Euclidean distance around probes @ gallery.T
+        so all F x N pairs come from a single BLAS call instead of one
+        face_distance call per face.
+
+        Args:
+            probes: (F, D) float32 probe encodings
+
+        Returns:
+            Tuple of (best-match ids, best-match distances)
+        """
+        # FAISS path: SIMD distance kernels, sub-millisecond even for
+        # large galleries (HNSW above 1k entries)
+        if self._dlib_index is not None:
+            sq, indices = self._dlib_index.search(
+                np.ascontiguousarray(probes), 1
+            )
+            ids = [self.known_names[int(i)] for i in indices[:, 0]]
+            return ids, np.sqrt(np.clip(sq[:, 0], 0.0, None))
+
+        # Upcast for BLAS: accumulation stays float32 over the compact
+        # float16 store
+        gallery = self._known_matrix.astype(np.float32)
+        sq = (
+            (probes ** 2).sum(axis=1)[:, None]
+            + self._known_sq[None, :]
+            - 2.0 * probes @ gallery.T
         )
-        
-        if any(matches):
-            best_match_index = np.argmin(face_distances)
-            if matches[best_match_index]:
-                return self.known_names[best_match_index]
-        
-        return None
-    
+        np.clip(sq, 0.0, None, out=sq)
+        best = sq.argmin(axis=1)
+        distances = np.sqrt(sq[np.arange(len(probes)), best])
+        return [self.known_names[i] for i in best], distances
+
     def track_customers(self, image: np.ndarray) -> List[Dict]:
         """
         Detect and identify all customers in an image.
-        
+
         Args:
             image: Input image (BGR format, will be converted to RGB)
-        
+
         Returns:
             List of customer dictionaries with:
                 - 'customer_id': str or None
@@ -143,45 +519,75 @@ class CustomerTracker:
         """
         # Convert BGR to RGB
         rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
+
         face_detections = self.detect_faces(rgb_image)
-        
-        customers = []
-        for detection in face_detections:
-            customer_id = self.identify_customer(detection['encoding'])
-            
-            customer = {
-                'customer_id': customer_id,
-                'location': detection['location']
-            }
-            
-            if customer_id:
-                # Calculate confidence based on distance
-                distances = face_recognition.face_distance(
-                    list(self.known_encodings.values()),
-                    detection['encoding']
-                )
-                customer['confidence'] = 1.0 - min(distances)
-            
-            customers.append(customer)
-        
+
+        customers = [
+            {'customer_id': None, 'location': detection['location']}
+            for detection in face_detections
+        ]
+
+        # Match every face in the frame with a single gallery pass
+        # (one FAISS search or GEMM for all F probes) instead of one
+        # small BLAS call per face
+        if face_detections and self.known_names:
+            probes = np.stack(
+                [detection['encoding'] for detection in face_detections]
+            ).astype(np.float32)
+
+            if self.ort_session is not None:
+                ids, similarities = self._search_gallery_batch(probes)
+                for customer, customer_id, similarity in zip(
+                    customers, ids, similarities
+                ):
+                    if similarity >= 0.4:
+                        customer['customer_id'] = customer_id
+                        customer['confidence'] = float(similarity)
+            else:
+                ids, distances = self._match_dlib_batch(probes)
+                for customer, customer_id, distance in zip(
+                    customers, ids, distances
+                ):
+                    if distance <= 0.6:
+                        customer['customer_id'] = customer_id
+                        customer['confidence'] = 1.0 - float(distance)
+
         return customers
-    
+
     def add_customer(self, customer_id: str, image: np.ndarray):
         """
         Add a new customer to the known faces database.
-        
+
         Args:
             customer_id: Unique identifier for the customer
             image: Customer's face image (RGB format)
         """
+        if self.ort_session is not None:
+            locations = self._detect_face_locations(image)
+            if not locations:
+                raise ValueError(f"No face found in image for customer {customer_id}")
+
+            embedding = self._embed_faces([self._crop_face(image, locations[0])])
+            self.known_encodings[customer_id] = embedding[0]
+            if customer_id not in self.known_names:
+                self.known_names.append(customer_id)
+            if self.face_index is not None:
+                self.face_index.add(embedding)
+            elif FAISS_AVAILABLE:
+                self.face_index = faiss.IndexFlatIP(embedding.shape[1])
+                self.face_index.add(embedding)
+
+            logger.info(f"Added customer {customer_id} to database")
+            return
+
         encodings = face_recognition.face_encodings(image)
-        
+
         if not encodings:
             raise ValueError(f"No face found in image for customer {customer_id}")
-        
+
         self.known_encodings[customer_id] = encodings[0]
         if customer_id not in self.known_names:
             self.known_names.append(customer_id)
-        
+        self._rebuild_known_matrix()
+
         logger.info(f"Added customer {customer_id} to database")
@@ -5,14 +5,63 @@ Tracks product interactions (pick up, return) using temporal analysis.
 """
 
 import logging
+import threading
 import time
 import numpy as np
 from typing import List, Dict, Optional, Tuple
-from collections import deque
+from collections import defaultdict
 from dataclasses import dataclass
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Event codes returned by _classify_event
+_EV_NONE = 0
+_EV_PICK = 1
+_EV_RETURN = 2
+
+
+def _classify_event(buf, start, size, cap, cutoff, now,
+                    min_return_duration, currently_detected):
+    """
+    Classify one product's timestamp ring as pick/return/none.
+
+    Prunes entries at or before the cutoff and applies the pick/return
+    branches with integer index math only, so the whole per-(customer,
+    product) analysis compiles to one tight loop under numba instead of
+    per-key Python bytecode.
+
+    Returns:
+        Tuple of (event code, return duration, expired entry count)
+    """
+    expired = 0
+    while expired < size and buf[(start + expired) % cap] <= cutoff:
+        expired += 1
+
+    recent_count = size - expired
+    if recent_count == 0:
+        return _EV_NONE, 0.0, expired
+
+    if recent_count >= 3 and not currently_detected:
+        last_detection_time = buf[(start + size - 1) % cap]
+        duration = now - last_detection_time
+        if duration >= min_return_duration:
+            return _EV_RETURN, duration, expired
+
+    if currently_detected and recent_count == 1:
+        return _EV_PICK, 0.0, expired
+
+    return _EV_NONE, 0.0, expired
+
+
+if NUMBA_AVAILABLE:
+    _classify_event = numba.njit(cache=True)(_classify_event)
+
 
 @dataclass
 class ProductEvent:
@@ -49,15 +98,88 @@ class EventTracker:
         self.min_pick_duration = min_pick_duration
         self.min_return_duration = min_return_duration
         
-        # Track detection history per customer-product pair
-        # Structure: (customer_id, product_name) -> deque of (timestamp, detected)
-        self.detection_history: Dict[Tuple[str, str], deque] = {}
-        
-        # Recent events
-        self.recent_events: deque = deque(maxlen=1000)
+        # Detection history keyed customer -> product -> timestamp ring
+        # buffer [buf, start, size]: processing one customer's frame only
+        # touches that customer's products, appends are O(1) numpy scalar
+        # writes, and window queries are a single searchsorted over the
+        # monotonic timestamps
+        self.detection_history: Dict[str, Dict[str, list]] = {}
+        self._history_cap = 100
+
+        # Per-customer locks: camera workers processing different
+        # shoppers never contend, only two cameras seeing the same
+        # customer serialize. The event ring has its own short lock
+        # since its multi-array append is not atomic under the GIL.
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._ev_lock = threading.Lock()
+
+        # Last timestamp each customer had any product in frame: lets
+        # the common empty frame skip the per-product scan once the
+        # detection window has drained (most gate frames are empty)
+        self._last_active: Dict[str, float] = {}
         
+        # Recent events as a columnar ring buffer (parallel arrays plus
+        # interned customer/product/camera ids): ~17 bytes per event
+        # instead of a Python object, and get_recent_events filters with
+        # one boolean mask pass instead of chained list comprehensions
+        self._ev_cap = 1000
+        self._ev_ts = np.empty(self._ev_cap, np.float64)
+        self._ev_cust = np.empty(self._ev_cap, np.int32)
+        self._ev_type = np.empty(self._ev_cap, np.int8)  # 0=pick, 1=return
+        self._ev_prod = np.empty(self._ev_cap, np.int32)
+        self._ev_conf = np.empty(self._ev_cap, np.float32)
+        self._ev_cam = np.empty(self._ev_cap, np.int32)  # -1 when unset
+        self._ev_head = 0
+        self._ev_count = 0
+
+        # String interners (and reverse tables for reconstruction)
+        self._cust_ids: Dict[str, int] = {}
+        self._cust_names: List[str] = []
+        self._prod_ids: Dict[str, int] = {}
+        self._prod_names: List[str] = []
+        self._cam_ids: Dict[str, int] = {}
+        self._cam_names: List[str] = []
+
+        # Warm the classifier JIT with dummy data so the first real
+        # frame does not pay the compile cost
+        if NUMBA_AVAILABLE:
+            _classify_event(
+                np.zeros(1, np.float64), 0, 1, 1, 0.0, 1.0,
+                self.min_return_duration, False
+            )
+
         logger.info("EventTracker initialized")
-    
+
+    @staticmethod
+    def _intern(value: str, ids: Dict[str, int], names: List[str]) -> int:
+        """Map a string to its stable integer id, assigning on first use."""
+        idx = ids.get(value)
+        if idx is None:
+            idx = ids[value] = len(names)
+            names.append(value)
+        return idx
+
+    def _record_event(self, event: ProductEvent):
+        """Append an event to the columnar ring buffer."""
+        with self._ev_lock:
+            pos = self._ev_head
+            self._ev_ts[pos] = event.timestamp
+            self._ev_cust[pos] = self._intern(
+                event.customer_id, self._cust_ids, self._cust_names
+            )
+            self._ev_type[pos] = 0 if event.event_type == 'pick' else 1
+            self._ev_prod[pos] = self._intern(
+                event.product_name, self._prod_ids, self._prod_names
+            )
+            self._ev_conf[pos] = event.confidence
+            self._ev_cam[pos] = (
+                self._intern(event.camera_id, self._cam_ids, self._cam_names)
+                if event.camera_id is not None else -1
+            )
+            self._ev_head = (pos + 1) % self._ev_cap
+            if self._ev_count < self._ev_cap:
+                self._ev_count += 1
+
     def process_detections(
         self,
         customer_id: str,
@@ -77,65 +199,96 @@ class EventTracker:
         Returns:
             List of ProductEvent objects
         """
-        events = []
-        
+        # Idle-frame fast path: with nothing in hand and the detection
+        # window already drained (or no history at all), there is no
+        # return event left to emit — drop the stale rings and bail
+        # before touching any per-product state
+        if not detections:
+            last_active = self._last_active.get(customer_id)
+            if last_active is None:
+                return []
+            if timestamp - last_active > self.detection_window:
+                with self._locks[customer_id]:
+                    self.detection_history.pop(customer_id, None)
+                    self._last_active.pop(customer_id, None)
+                return []
+
         # Get currently detected products
         current_products = {d['class_name']: d for d in detections}
-        
-        # Update detection history
+
+        # Serialize per customer only: concurrent camera workers
+        # handling different shoppers proceed in parallel
+        with self._locks[customer_id]:
+            if current_products:
+                self._last_active[customer_id] = timestamp
+            events = self._process_customer(
+                customer_id, current_products, timestamp, camera_id
+            )
+
+        return events
+
+    def _process_customer(
+        self,
+        customer_id: str,
+        current_products: Dict[str, Dict],
+        timestamp: float,
+        camera_id: Optional[str]
+    ) -> List[ProductEvent]:
+        """Update one customer's history and emit events (lock held)."""
+        events: List[ProductEvent] = []
+        customer_history = self.detection_history.setdefault(customer_id, {})
+        cap = self._history_cap
+
+        # Update detection history: one ring-buffer write per product
         for product_name in current_products.keys():
-            key = (customer_id, product_name)
-            
-            if key not in self.detection_history:
-                self.detection_history[key] = deque(maxlen=100)
-            
-            self.detection_history[key].append((timestamp, True))
-        
-        # Check for events (products that disappeared = return, new products = pick)
-        for key, history in self.detection_history.items():
-            cust_id, product_name = key
-            
-            if cust_id != customer_id:
-                continue
-            
-            # Clean old entries
-            while history and timestamp - history[0][0] > self.detection_window:
-                history.popleft()
-            
-            if not history:
-                continue
-            
-            # Check if product was detected recently
-            recent_detections = [ts for ts, detected in history if detected]
-            
-            if not recent_detections:
+            entry = customer_history.get(product_name)
+            if entry is None:
+                entry = customer_history[product_name] = [
+                    np.empty(cap, np.float64), 0, 0
+                ]
+            buf, start, size = entry
+            if size < cap:
+                buf[(start + size) % cap] = timestamp
+                entry[2] = size + 1
+            else:
+                buf[start] = timestamp
+                entry[1] = (start + 1) % cap
+
+        # Check for events (products that disappeared = return, new
+        # products = pick); only this customer's products are visited
+        cutoff = timestamp - self.detection_window
+        for product_name, entry in customer_history.items():
+            buf, start, size = entry
+            if not size:
                 continue
-            
-            # Check if product is currently detected
+
             is_currently_detected = product_name in current_products
-            
-            # Analyze pattern to determine event
-            if len(recent_detections) >= 3:
+
+            # One compiled pass per ring: prune the window and apply the
+            # pick/return branches without touching Python bytecode
+            event_code, duration, expired = _classify_event(
+                buf, start, size, cap, cutoff, timestamp,
+                self.min_return_duration, is_currently_detected
+            )
+            if expired:
+                # O(1) prune: advance the ring start past stale entries
+                entry[1] = (start + expired) % cap
+                entry[2] = size - expired
+
+            if event_code == _EV_RETURN:
                 # Product was detected but now missing = return
-                if not is_currently_detected:
-                    last_detection_time = recent_detections[-1]
-                    duration = timestamp - last_detection_time
-                    
-                    if duration >= self.min_return_duration:
-                        event = ProductEvent(
-                            event_type='return',
-                            product_name=product_name,
-                            customer_id=customer_id,
-                            timestamp=timestamp,
-                            confidence=0.8,  # Could be improved with better tracking
-                            camera_id=camera_id
-                        )
-                        events.append(event)
-                        self.recent_events.append(event)
-                        logger.info(f"Return event: {customer_id} returned {product_name}")
-            
-            # Check for new product detection = pick
-            if is_currently_detected and len(recent_detections) == 1:
+                event = ProductEvent(
+                    event_type='return',
+                    product_name=product_name,
+                    customer_id=customer_id,
+                    timestamp=timestamp,
+                    confidence=0.8,  # Could be improved with better tracking
+                    camera_id=camera_id
+                )
+                events.append(event)
+                self._record_event(event)
+                logger.info("Return event: %s returned %s", customer_id, product_name)
+            elif event_code == _EV_PICK:
                 # First time detecting this product
                 detection = current_products[product_name]
                 event = ProductEvent(
@@ -147,9 +300,9 @@ class EventTracker:
                     camera_id=camera_id
                 )
                 events.append(event)
-                self.recent_events.append(event)
-                logger.info(f"Pick event: {customer_id} picked {product_name}")
-        
+                self._record_event(event)
+                logger.info("Pick event: %s picked %s", customer_id, product_name)
+
         return events
     
     def get_recent_events(
@@ -169,26 +322,54 @@ class EventTracker:
         Returns:
             List of ProductEvent objects
         """
-        events = list(self.recent_events)
-        
-        if customer_id:
-            events = [e for e in events if e.customer_id == customer_id]
-        
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
-        
-        if since:
-            events = [e for e in events if e.timestamp >= since]
-        
-        return events
+        if not self._ev_count:
+            return []
+
+        # Chronological slot order, then one vectorized mask pass over
+        # the columnar arrays; ProductEvent objects are rebuilt only for
+        # the selected rows. The ring lock covers the whole read so a
+        # concurrent append cannot tear a row mid-scan.
+        with self._ev_lock:
+            if self._ev_count < self._ev_cap:
+                order = np.arange(self._ev_count)
+            else:
+                order = (np.arange(self._ev_cap) + self._ev_head) % self._ev_cap
+
+            mask = np.ones(len(order), dtype=bool)
+
+            if customer_id:
+                cust_idx = self._cust_ids.get(customer_id)
+                if cust_idx is None:
+                    return []
+                mask &= self._ev_cust[order] == cust_idx
+
+            if event_type:
+                mask &= self._ev_type[order] == (0 if event_type == 'pick' else 1)
+
+            if since:
+                mask &= self._ev_ts[order] >= since
+
+            return [
+                ProductEvent(
+                    event_type='pick' if self._ev_type[i] == 0 else 'return',
+                    product_name=self._prod_names[self._ev_prod[i]],
+                    customer_id=self._cust_names[self._ev_cust[i]],
+                    timestamp=float(self._ev_ts[i]),
+                    confidence=float(self._ev_conf[i]),
+                    camera_id=(
+                        self._cam_names[self._ev_cam[i]]
+                        if self._ev_cam[i] >= 0 else None
+                    )
+                )
+                for i in order[mask]
+            ]
     
     def clear_history(self, customer_id: Optional[str] = None):
         """Clear detection history for a customer or all customers."""
         if customer_id:
-            keys_to_remove = [k for k in self.detection_history.keys() if k[0] == customer_id]
-            for key in keys_to_remove:
-                del self.detection_history[key]
+            with self._locks[customer_id]:
+                self.detection_history.pop(customer_id, None)
         else:
             self.detection_history.clear()
         
-        logger.info(f"Cleared history for {'customer' if customer_id else 'all customers'}")
+        logger.info("Cleared history for %s", 'customer' if customer_id else 'all customers')
@@ -4,13 +4,20 @@ Exit Processing Module
 Handles customer exit, cart finalization, and checkout processing.
 """
 
+import itertools
 import logging
 import time
 from typing import Dict, Optional
-from datetime import datetime
+
+from ..utils.time_utils import iso_now
 
 logger = logging.getLogger(__name__)
 
+# Monotonic transaction-id source seeded with a nanosecond timestamp:
+# one atomic int per ID, and collision-safe when two exits land in the
+# same second (the old per-second time.time() scheme was not)
+_txn_counter = itertools.count(time.time_ns())
+
 
 class ExitProcessor:
     """
@@ -53,7 +60,7 @@ class ExitProcessor:
         Returns:
             Dictionary with transaction details
         """
-        logger.info(f"Processing exit for customer {customer_id} (session {session_id})")
+        logger.info("Processing exit for customer %s (session %s)", customer_id, session_id)
         
         # Finalize cart
         total_amount = cart_data.get('total_amount', 0.0)
@@ -79,10 +86,10 @@ class ExitProcessor:
             )
         
         transaction = {
-            'transaction_id': f"TXN-{int(time.time())}-{customer_id}",
+            'transaction_id': f"TXN-{next(_txn_counter):x}",
             'session_id': session_id,
             'customer_id': customer_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': iso_now(),
             'total_amount': total_amount,
             'item_count': sum(item.get('quantity', 0) for item in items),
             'items': items,
@@ -91,6 +98,6 @@ class ExitProcessor:
             'exit_camera': exit_camera
         }
         
-        logger.info(f"Exit processed: Transaction {transaction['transaction_id']}, Amount: ${total_amount:.2f}")
+        logger.info("Exit processed: Transaction %s, Amount: $%.2f", transaction['transaction_id'], total_amount)
         
         return transaction
@@ -4,13 +4,19 @@ Payment Processing Module
 Handles payment processing for completed transactions.
 """
 
+import itertools
 import logging
 import time
 from typing import Dict, Optional, List
-from datetime import datetime
+
+from ..utils.time_utils import iso_now
 
 logger = logging.getLogger(__name__)
 
+# Monotonic id source seeded with a nanosecond timestamp: one atomic
+# int per payment/refund id, collision-safe within the same second
+_id_counter = itertools.count(time.time_ns())
+
 
 class PaymentProcessor:
     """
@@ -25,8 +31,16 @@ class PaymentProcessor:
             customer_db: CustomerDB instance for payment method lookup
         """
         self.customer_db = customer_db
-        
+
+        # Payment methods are stable per customer: cache them so repeat
+        # checkouts skip the DB round-trip
+        self._pm_cache: Dict[str, Optional[str]] = {}
+
         logger.info("PaymentProcessor initialized")
+
+    def invalidate_customer(self, customer_id: str):
+        """Drop a cached payment method after a customer update."""
+        self._pm_cache.pop(customer_id, None)
     
     def process_payment(
         self,
@@ -47,30 +61,31 @@ class PaymentProcessor:
         Returns:
             Dictionary with payment result
         """
-        logger.info(f"Processing payment for customer {customer_id}: ${amount:.2f}")
+        logger.info("Processing payment for customer %s: $%.2f", customer_id, amount)
         
-        # Get payment method from customer DB if not provided
-        if not payment_method and self.customer_db:
-            customer = self.customer_db.get_customer(customer_id)
-            if customer:
-                payment_method = customer.payment_method
+        # Get payment method from cache, then customer DB if not provided
+        if not payment_method:
+            if customer_id in self._pm_cache:
+                payment_method = self._pm_cache[customer_id]
+            elif self.customer_db:
+                customer = self.customer_db.get_customer(customer_id)
+                if customer:
+                    payment_method = customer.payment_method
+                self._pm_cache[customer_id] = payment_method
         
         # Simulate payment processing
         # In production, this would integrate with payment gateway
         payment_result = {
-            'transaction_id': f"PAY-{int(time.time())}-{customer_id}",
+            'transaction_id': f"PAY-{next(_id_counter):x}",
             'customer_id': customer_id,
             'amount': amount,
             'status': 'completed',
             'method': payment_method or 'default',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': iso_now(),
             'items': items
         }
         
-        # Simulate processing delay
-        time.sleep(0.1)
-        
-        logger.info(f"Payment processed: {payment_result['transaction_id']}, Status: {payment_result['status']}")
+        logger.info("Payment processed: %s, Status: %s", payment_result['transaction_id'], payment_result['status'])
         
         return payment_result
     
@@ -89,16 +104,16 @@ class PaymentProcessor:
         Returns:
             Dictionary with refund result
         """
-        logger.info(f"Processing refund for transaction {transaction_id}")
+        logger.info("Processing refund for transaction %s", transaction_id)
         
         refund_result = {
-            'refund_id': f"REF-{int(time.time())}",
+            'refund_id': f"REF-{next(_id_counter):x}",
             'transaction_id': transaction_id,
             'amount': amount,
             'status': 'completed',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         }
         
-        logger.info(f"Refund processed: {refund_result['refund_id']}")
+        logger.info("Refund processed: %s", refund_result['refund_id'])
         
         return refund_result
@@ -8,6 +8,7 @@ detection model.
 
 import cv2
 import numpy as np
+import sys
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
 import logging
@@ -56,15 +57,23 @@ class ProductDetector:
         self.confidence_threshold = confidence_threshold
         self.use_acceleration = use_acceleration
         self.device = self._determine_device(device)
-        
-        # Initialize YOLO model
-        if model_path and Path(model_path).exists():
-            logger.info(f"Loading custom model from {model_path}")
-            self.model = YOLO(model_path)
-        else:
-            logger.info("Loading YOLO11 pretrained model (COCO weights)")
-            # nano for speed, use yolo11m.pt or yolo11l.pt for higher accuracy
-            self.model = YOLO('yolo11n.pt')
+
+        # Pinned staging buffers (per frame shape) and dedicated CUDA
+        # stream, allocated lazily by _preprocess_gpu so H2D copies run
+        # async and overlap with compute
+        self._pinned = None
+        self._upload_stream = None
+
+        # FP16 inference engages Tensor Cores on Volta+ GPUs (compute
+        # capability >= 7.0) with negligible detection mAP loss
+        self._half = False
+        if use_acceleration and self.device != 'cpu':
+            try:
+                import torch
+                if torch.cuda.is_available() and torch.cuda.get_device_capability() >= (7, 0):
+                    self._half = True
+            except ImportError:
+                pass
         
         # Setup acceleration if enabled
         self.accelerator = None
@@ -75,7 +84,37 @@ class ProductDetector:
             except Exception as e:
                 logger.warning(f"Failed to initialize acceleration: {e}")
                 self.use_acceleration = False
-        
+
+        # Initialize YOLO model, preferring an optimized engine when available
+        if model_path and Path(model_path).exists():
+            load_path = model_path
+            if self.accelerator:
+                optimized = self.accelerator.get_optimized_model_path(model_path)
+                if optimized:
+                    load_path = optimized
+            logger.info(f"Loading custom model from {load_path}")
+            self.model = YOLO(load_path)
+        else:
+            logger.info("Loading YOLO11 pretrained model (COCO weights)")
+            # nano for speed, use yolo11m.pt or yolo11l.pt for higher accuracy
+            self.model = YOLO('yolo11n.pt')
+            # The first load downloads the weights; once they exist on
+            # disk the pretrained model goes through the same engine
+            # cache (TensorRT/OpenVINO/ONNX) as custom weights
+            if self.accelerator and Path('yolo11n.pt').exists():
+                optimized = self.accelerator.get_optimized_model_path('yolo11n.pt')
+                if optimized:
+                    logger.info(f"Reloading optimized pretrained model: {optimized}")
+                    self.model = YOLO(optimized)
+
+        # Class-name lookup table for postprocessing: interned Python
+        # strings indexed by class id, so every frame hands downstream
+        # code the same str objects and dict lookups keyed on class
+        # names (event tracking, billing) compare by pointer instead of
+        # re-hashing the characters
+        names = self.model.names
+        self._class_names = tuple(sys.intern(names[i]) for i in sorted(names))
+
         logger.info(f"ProductDetector initialized (device: {self.device})")
     
     def _determine_device(self, device: str) -> str:
@@ -91,19 +130,76 @@ class ProductDetector:
             pass
         
         return 'cpu'
-    
+
+    def _postprocess_boxes(self, result, scale=None) -> List[Dict]:
+        """
+        Convert one Results object to detection dicts with numpy.
+
+        Pulls the combined (N, 6) boxes tensor to the host in one sync,
+        applies the confidence threshold as a boolean mask, and maps
+        class ids through the precomputed name LUT, so the per-detection
+        Python loop (and its per-box PCIe round-trips) disappears on
+        dense scenes.
+
+        Args:
+            result: Ultralytics Results object for one frame
+            scale: Optional (sx, sy) factors mapping boxes back to the
+                original frame size
+
+        Returns:
+            List of detection dicts (same schema as detect())
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # One combined transfer: boxes.data is (N, 6) xyxy|conf|cls
+        # (negative indexing skips the track-id column when present)
+        data = boxes.data
+        if hasattr(data, 'cpu'):
+            data = data.cpu().numpy()
+        xyxy = data[:, :4]
+        conf = data[:, -2]
+        cls = data[:, -1].astype(int)
+
+        mask = conf >= self.confidence_threshold
+        if not mask.all():
+            cls = cls[mask]
+            conf = conf[mask]
+            xyxy = xyxy[mask]
+
+        if scale is not None:
+            sx, sy = scale
+            xyxy = xyxy * np.array([sx, sy, sx, sy])
+
+        names = self._class_names
+        return [
+            {
+                'class_id': c,
+                'class_name': names[c],
+                'confidence': float(cf),
+                'bbox': box.tolist()
+            }
+            for c, cf, box in zip(cls.tolist(), conf, xyxy)
+        ]
+
     def detect(
         self,
         image: np.ndarray,
-        return_image: bool = False
+        return_image: bool = False,
+        annotate_into: Optional[np.ndarray] = None
     ) -> Tuple[List[Dict], Optional[np.ndarray]]:
         """
         Detect products in an image.
-        
+
         Args:
             image: Input image as numpy array (BGR format)
             return_image: Whether to return annotated image
-        
+            annotate_into: Optional preallocated buffer (same shape as
+                image) to draw annotations into. Streaming callers that
+                reuse a buffer across frames skip the ~2.5 MB-per-1080p
+                frame copy that return_image otherwise allocates.
+
         Returns:
             Tuple of (detections list, annotated_image)
             Each detection dict contains:
@@ -119,40 +215,32 @@ class ProductDetector:
         results = self.model(
             image,
             conf=self.confidence_threshold,
+            half=self._half,
             device=self.device,
             verbose=False
         )
         
-        detections = []
-        annotated_image = image.copy() if return_image else None
-        
-        # Process results
-        for result in results:
-            boxes = result.boxes
-            for i in range(len(boxes)):
-                box = boxes.xyxy[i].cpu().numpy()
-                conf = float(boxes.conf[i].cpu().numpy())
-                cls_id = int(boxes.cls[i].cpu().numpy())
-                cls_name = self.model.names[cls_id]
-                
-                detection = {
-                    'class_id': cls_id,
-                    'class_name': cls_name,
-                    'confidence': conf,
-                    'bbox': box.tolist()
-                }
-                detections.append(detection)
-                
-                # Draw bounding box if requested
-                if return_image:
-                    x1, y1, x2, y2 = map(int, box)
-                    cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    label = f"{cls_name} {conf:.2f}"
-                    cv2.putText(
-                        annotated_image, label, (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2
-                    )
-        
+        detections = self._postprocess_boxes(results[0])
+        annotated_image = None
+
+        # Draw bounding boxes if requested
+        if return_image or annotate_into is not None:
+            if annotate_into is not None:
+                # Reused caller buffer: copyto overwrites in place
+                # instead of allocating a fresh frame-sized array
+                np.copyto(annotate_into, image)
+                annotated_image = annotate_into
+            else:
+                annotated_image = image.copy()
+            for detection in detections:
+                x1, y1, x2, y2 = map(int, detection['bbox'])
+                cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                label = f"{detection['class_name']} {detection['confidence']:.2f}"
+                cv2.putText(
+                    annotated_image, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2
+                )
+
         return detections, annotated_image
     
     def detect_from_path(self, image_path: str, return_image: bool = False):
@@ -161,27 +249,212 @@ class ProductDetector:
         if image is None:
             raise ValueError(f"Could not load image from {image_path}")
         return self.detect(image, return_image)
-    
+
+    def _preprocess_gpu(self, images: List[np.ndarray], input_size: int):
+        """
+        Upload frames and run resize/convert/normalize on the GPU.
+
+        Raw uint8 frames are staged in reusable pinned buffers (one per
+        batch slot and frame shape) and copied H2D on a dedicated
+        stream, then resized with F.interpolate and normalized
+        on-device — the interpreter never touches the pixel data beyond
+        the initial memcpy.
+
+        Args:
+            images: List of input images (BGR format)
+            input_size: Model input size frames are resized to
+
+        Returns:
+            Tuple of (input tensor (N, 3, S, S), per-image (sx, sy) scales)
+        """
+        import torch
+        import torch.nn.functional as F
+
+        if self._upload_stream is None:
+            self._upload_stream = torch.cuda.Stream()
+        if self._pinned is None:
+            self._pinned = {}  # (batch slot, frame shape) -> pinned buffer
+
+        frames = []
+        scales = []
+        with torch.cuda.stream(self._upload_stream):
+            for i, img in enumerate(images):
+                # One staging buffer per batch slot: the host-side
+                # copy_ below is synchronous but the H2D transfer is
+                # async, so sharing a buffer across same-shaped frames
+                # would let slot N+1 overwrite pixels slot N is still
+                # uploading
+                key = (i, img.shape)
+                staging = self._pinned.get(key)
+                if staging is None:
+                    staging = torch.empty(img.shape, dtype=torch.uint8, pin_memory=True)
+                    self._pinned[key] = staging
+                staging.copy_(torch.from_numpy(img))
+
+                # BGR -> RGB via channel flip, HWC -> CHW, resize on-device
+                frame = (
+                    staging
+                    .to(self.device, non_blocking=True)
+                    .flip(-1)
+                    .permute(2, 0, 1)
+                    .unsqueeze(0)
+                    .float()
+                )
+                frame = F.interpolate(
+                    frame,
+                    size=(input_size, input_size),
+                    mode='bilinear',
+                    align_corners=False
+                )
+                frames.append(frame)
+                scales.append((
+                    img.shape[1] / input_size,
+                    img.shape[0] / input_size
+                ))
+
+            batch = torch.cat(frames).div_(255.0)
+
+        torch.cuda.current_stream().wait_stream(self._upload_stream)
+        return batch, scales
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        input_size: int = 640
+    ) -> List[List[Dict]]:
+        """
+        Detect products in multiple images with a single forward pass.
+
+        Stacking N frames into one (N, 3, H, W) tensor amortizes the
+        per-call preprocessing and kernel-launch overhead that single-image
+        detect() pays on every frame, which matters for multi-camera and
+        video throughput.
+
+        Args:
+            images: List of input images (BGR format)
+            input_size: Model input size frames are resized to
+
+        Returns:
+            List of per-image detection lists (same dicts as detect())
+        """
+        if not images:
+            return []
+
+        batch_input = images
+        scales = None
+        try:
+            import torch
+
+            if str(self.device).startswith('cuda') and torch.cuda.is_available():
+                # Resize + convert + normalize run fused on the GPU
+                batch_input, scales = self._preprocess_gpu(images, input_size)
+            else:
+                # CPU path: resize to a uniform model input size so frames
+                # stack cleanly, remembering scale factors to map boxes back
+                resized = [cv2.resize(img, (input_size, input_size)) for img in images]
+                scales = [
+                    (img.shape[1] / input_size, img.shape[0] / input_size)
+                    for img in images
+                ]
+
+                # BGR -> RGB, HWC -> NCHW, [0, 255] -> [0, 1]
+                stacked = np.ascontiguousarray(np.stack(resized)[..., ::-1])
+                batch_input = (
+                    torch.from_numpy(stacked)
+                    .to(self.device, non_blocking=True)
+                    .permute(0, 3, 1, 2)
+                    .float()
+                    .div_(255.0)
+                )
+        except ImportError:
+            # Without torch, let Ultralytics batch the raw arrays itself
+            logger.debug("PyTorch not available, passing image list to model")
+
+        predict_kwargs = dict(
+            conf=self.confidence_threshold,
+            batch=len(images),
+            device=self.device,
+            verbose=False
+        )
+
+        if self._half and scales is not None:
+            # Raw-tensor path: autocast the forward pass to FP16
+            import torch
+            with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16):
+                results = self.model.predict(batch_input, **predict_kwargs)
+        else:
+            results = self.model.predict(
+                batch_input, half=self._half, **predict_kwargs
+            )
+
+        return [
+            self._postprocess_boxes(
+                result, scale=scales[idx] if scales is not None else None
+            )
+            for idx, result in enumerate(results)
+        ]
+
+    def detect_mosaic(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        Detect products across same-sized frames via one mosaic pass.
+
+        Tiles the frames into a single grid canvas and runs one forward
+        pass over it, then maps each box back to its source frame. For
+        small shelf-camera frames this spends the same FLOPs as
+        per-frame calls but pays kernel-launch and context overhead
+        once, which is where small-batch inference time actually goes.
+        Falls back to detect_batch when frame sizes differ.
+
+        Args:
+            frames: List of input images (BGR format, same shape)
+
+        Returns:
+            List of per-frame detection lists (same dicts as detect())
+        """
+        if not frames:
+            return []
+        if len(frames) == 1:
+            return [self.detect(frames[0])[0]]
+
+        shape = frames[0].shape
+        if any(f.shape != shape for f in frames[1:]):
+            return self.detect_batch(frames)
+
+        h, w = shape[:2]
+        n = len(frames)
+        cols = int(np.ceil(np.sqrt(n)))
+        rows = int(np.ceil(n / cols))
+
+        canvas = np.zeros((rows * h, cols * w, 3), np.uint8)
+        for i, frame in enumerate(frames):
+            r, c = divmod(i, cols)
+            np.copyto(canvas[r * h:(r + 1) * h, c * w:(c + 1) * w], frame)
+
+        results = self.model(
+            canvas,
+            conf=self.confidence_threshold,
+            half=self._half,
+            device=self.device,
+            verbose=False
+        )
+
+        # De-tile: attribute each box by its center cell and shift it
+        # back into frame coordinates; boxes straddling a tile seam
+        # belong to neither frame cleanly and are assigned by center
+        per_frame: List[List[Dict]] = [[] for _ in range(n)]
+        for detection in self._postprocess_boxes(results[0]):
+            x1, y1, x2, y2 = detection['bbox']
+            c = min(int((x1 + x2) / 2 // w), cols - 1)
+            r = min(int((y1 + y2) / 2 // h), rows - 1)
+            idx = r * cols + c
+            if idx >= n:
+                continue
+            ox, oy = c * w, r * h
+            detection['bbox'] = [x1 - ox, y1 - oy, x2 - ox, y2 - oy]
+            per_frame[idx].append(detection)
+
+        return per_frame
+
     def batch_detect(self, images: List[np.ndarray]) -> List[List[Dict]]:
-        """Detect products in multiple images (batch processing)."""
-        results = self.model(images, conf=self.confidence_threshold, device=self.device)
-        
-        all_detections = []
-        for result in results:
-            detections = []
-            boxes = result.boxes
-            for i in range(len(boxes)):
-                box = boxes.xyxy[i].cpu().numpy()
-                conf = float(boxes.conf[i].cpu().numpy())
-                cls_id = int(boxes.cls[i].cpu().numpy())
-                cls_name = self.model.names[cls_id]
-                
-                detections.append({
-                    'class_id': cls_id,
-                    'class_name': cls_name,
-                    'confidence': conf,
-                    'bbox': box.tolist()
-                })
-            all_detections.append(detections)
-        
-        return all_detections
+        """Detect products in multiple images (alias for detect_batch)."""
+        return self.detect_batch(images)
@@ -4,10 +4,14 @@ Receipt Generation Module
 Generates electronic receipts in various formats (PDF, email, SMS).
 """
 
+import copy
 import logging
 from typing import Dict, Optional
 from datetime import datetime
 from pathlib import Path
+from xml.sax.saxutils import escape as xml_escape
+
+from ..utils.serialization import dumps_json
 
 try:
     from reportlab.lib.pagesizes import letter
@@ -16,12 +20,30 @@ try:
     from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
     from reportlab.lib.styles import getSampleStyleSheet
     REPORTLAB_AVAILABLE = True
+    # The C accelerator plugs into reportlab's text-measurement and
+    # PDF-escaping internals automatically when present (~35% faster
+    # generation); probe for it so missing-extension deployments are
+    # visible in the logs rather than silently slow
+    try:
+        from reportlab.lib import rl_accel  # noqa: F401
+        RL_ACCEL_AVAILABLE = True
+    except ImportError:
+        RL_ACCEL_AVAILABLE = False
+        logging.warning(
+            "reportlab C accelerator (rl_accel) missing; install reportlab "
+            "with its C extension for ~35% faster PDF generation"
+        )
 except ImportError:
     REPORTLAB_AVAILABLE = False
+    RL_ACCEL_AVAILABLE = False
     logging.warning("reportlab not available. Install with: pip install reportlab")
 
 logger = logging.getLogger(__name__)
 
+# Static column headers for the items table; rows are never mutated by
+# Table, so one tuple serves every receipt
+_TABLE_HEADER = ('Product', 'Qty', 'Unit Price', 'Total')
+
 
 class ReceiptGenerator:
     """
@@ -37,7 +59,31 @@ class ReceiptGenerator:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        # Style/state setup dominates short PDF generation, so build the
+        # stylesheet, table style and spacer once and reuse them across
+        # receipts (Spacer is stateless and safe to share between
+        # stories)
+        if REPORTLAB_AVAILABLE:
+            self._styles = getSampleStyleSheet()
+            self._table_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ])
+            self._spacer = Spacer(1, 0.2 * inch)
+
+        # Parsed title Paragraphs keyed by store name: the inline-XML
+        # parse happens once per store rather than once per receipt.
+        # Paragraph grows layout state during doc.build, so retrieval
+        # hands out a shallow copy instead of the cached instance.
+        self._title_cache: Dict[str, object] = {}
+
         logger.info(f"ReceiptGenerator initialized (output_dir={output_dir})")
     
     def generate_receipt(
@@ -104,46 +150,42 @@ class ReceiptGenerator:
         
         doc = SimpleDocTemplate(str(file_path), pagesize=letter)
         story = []
-        styles = getSampleStyleSheet()
-        
+        styles = self._styles
+
         # Title
-        title = Paragraph(f"<b>{store_name}</b>", styles['Title'])
-        story.append(title)
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Receipt info
-        info_text = f"""
-        Receipt ID: {receipt_data['receipt_id']}<br/>
-        Customer: {receipt_data['customer_id']}<br/>
-        Date: {receipt_data['timestamp']}<br/>
-        """
+        title = self._title_cache.get(store_name)
+        if title is None:
+            title = Paragraph(f"<b>{xml_escape(store_name)}</b>", styles['Title'])
+            self._title_cache[store_name] = title
+        story.append(copy.copy(title))
+        story.append(self._spacer)
+
+        # Receipt info — values are escaped up front so stray &/< in
+        # customer-supplied ids never trips ParaParser's markup handling
+        info_text = (
+            f"Receipt ID: {xml_escape(receipt_data['receipt_id'])}<br/>"
+            f"Customer: {xml_escape(receipt_data['customer_id'])}<br/>"
+            f"Date: {xml_escape(receipt_data['timestamp'])}<br/>"
+        )
         info = Paragraph(info_text, styles['Normal'])
         story.append(info)
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Items table
-        data = [['Product', 'Qty', 'Unit Price', 'Total']]
-        for item in receipt_data['items']:
-            data.append([
-                item['product'],
-                str(item['quantity']),
-                f"${item['unit_price']:.2f}",
-                f"${item['total']:.2f}"
-            ])
-        
+        story.append(self._spacer)
+
+        # Items table, rows built in one comprehension with a bound
+        # formatter alias for the price cells
+        fmt = "${:.2f}".format
+        data = [_TABLE_HEADER] + [
+            [item['product'],
+             str(item['quantity']),
+             fmt(item['unit_price']),
+             fmt(item['total'])]
+            for item in receipt_data['items']
+        ]
+
         table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        table.setStyle(self._table_style)
         story.append(table)
-        story.append(Spacer(1, 0.2*inch))
+        story.append(self._spacer)
         
         # Total
         total_text = f"<b>Total: ${receipt_data['total']:.2f}</b>"
@@ -152,7 +194,7 @@ class ReceiptGenerator:
         
         # Payment status
         if receipt_data.get('payment_status'):
-            payment_text = f"Payment Status: {receipt_data['payment_status']}"
+            payment_text = f"Payment Status: {xml_escape(receipt_data['payment_status'])}"
             payment = Paragraph(payment_text, styles['Normal'])
             story.append(payment)
         
@@ -164,6 +206,14 @@ class ReceiptGenerator:
         filename = f"{receipt_data['receipt_id']}.txt"
         file_path = self.output_dir / filename
         
+        # One comprehension for the item block (C-level list build, no
+        # per-item append dispatch), then a single list for the join
+        item_lines = [
+            f"{item['quantity']}x {item['product']:<20} "
+            f"${item['unit_price']:.2f} each = ${item['total']:.2f}"
+            for item in receipt_data['items']
+        ]
+
         lines = [
             "=" * 50,
             store_name,
@@ -172,36 +222,28 @@ class ReceiptGenerator:
             f"Customer: {receipt_data['customer_id']}",
             f"Date: {receipt_data['timestamp']}",
             "-" * 50,
-            ""
-        ]
-        
-        for item in receipt_data['items']:
-            lines.append(
-                f"{item['quantity']}x {item['product']:<20} "
-                f"${item['unit_price']:.2f} each = ${item['total']:.2f}"
-            )
-        
-        lines.extend([
+            "",
+            *item_lines,
             "",
             "-" * 50,
             f"Total: ${receipt_data['total']:.2f}",
             f"Payment Status: {receipt_data.get('payment_status', 'pending')}",
             "=" * 50
-        ])
-        
-        with open(file_path, 'w') as f:
-            f.write('\n'.join(lines))
+        ]
         
+        # Pre-encode and write in one binary call: no text-mode codec
+        # layer, one open/write/close cycle per receipt
+        file_path.write_bytes('\n'.join(lines).encode('utf-8'))
+
         return file_path
     
     def _generate_json(self, receipt_data: Dict) -> Path:
         """Generate JSON receipt."""
-        import json
-        
         filename = f"{receipt_data['receipt_id']}.json"
         file_path = self.output_dir / filename
-        
-        with open(file_path, 'w') as f:
-            json.dump(receipt_data, f, indent=2)
-        
+
+        # orjson-backed encode (falls back to stdlib), written in one
+        # syscall instead of json.dump's chunked writes
+        file_path.write_bytes(dumps_json(receipt_data, indent=True))
+
         return file_path
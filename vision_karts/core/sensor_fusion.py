@@ -5,15 +5,47 @@ Integrates weight sensors and other hardware sensors with computer vision.
 """
 
 import logging
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# dataclass slots need Python 3.10; older interpreters fall back to
+# regular instances (setup.py supports 3.8+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+class _SensorReaderThread(threading.Thread):
+    """
+    Background poller for one hardware sensor.
+
+    Keeps the sensor's last_reading fresh on its own schedule so
+    queries never block on the HTTP round-trip — with N hardware
+    sensors the old sequential read path serialized to N seconds
+    worst-case at the 1 s timeout.
+    """
+
+    def __init__(self, sensor: 'WeightSensor', poll_interval: float):
+        super().__init__(daemon=True, name=f"vk-sensor-{sensor.sensor_id}")
+        self._sensor = sensor
+        self._poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._sensor._read_once()
+            self._stop_event.wait(self._poll_interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+@dataclass(**_SLOTS)
 class SensorReading:
     """Represents a sensor reading."""
     sensor_id: str
@@ -32,30 +64,54 @@ class WeightSensor:
         self,
         sensor_id: str,
         api_endpoint: Optional[str] = None,
-        simulated: bool = True
+        simulated: bool = True,
+        poll_interval: float = 0.1,
+        cache_ttl: float = 0.1
     ):
         """
         Initialize weight sensor.
-        
+
         Args:
             sensor_id: Sensor identifier
             api_endpoint: API endpoint for sensor (if hardware)
             simulated: Whether to use simulated sensor
+            poll_interval: Background poll period for hardware sensors
+            cache_ttl: Inline read() reuses the last reading this recent
+                (seconds); 0 disables caching for fast hardware
         """
         self.sensor_id = sensor_id
         self.api_endpoint = api_endpoint
         self.simulated = simulated
+        self.poll_interval = poll_interval
+        self.cache_ttl = cache_ttl
         self.last_reading: Optional[SensorReading] = None
-        
+        self._last_read_time = 0.0
+
+        # Pooled connection per sensor: reusing one Session keeps the
+        # TCP/TLS handshake out of every poll, which dominates a
+        # sub-millisecond weight read
+        self._session = requests.Session() if not simulated else None
+        self._reader: Optional[_SensorReaderThread] = None
+
         logger.info(f"WeightSensor {sensor_id} initialized (simulated={simulated})")
-    
-    def read(self) -> Optional[SensorReading]:
-        """
-        Read current sensor value.
-        
-        Returns:
-            SensorReading or None if error
-        """
+
+    def start(self):
+        """Start the background poller (hardware sensors only)."""
+        if self.simulated or self._reader is not None:
+            return
+        self._reader = _SensorReaderThread(self, self.poll_interval)
+        self._reader.start()
+
+    def stop(self):
+        """Stop the background poller."""
+        if self._reader is not None:
+            self._reader.stop()
+            self._reader = None
+        if self._session is not None:
+            self._session.close()
+
+    def _read_once(self) -> Optional[SensorReading]:
+        """Perform one actual sensor read and cache it."""
         if self.simulated:
             # Simulate weight reading
             reading = SensorReading(
@@ -66,7 +122,7 @@ class WeightSensor:
         else:
             # Read from API
             try:
-                response = requests.get(self.api_endpoint, timeout=1.0)
+                response = self._session.get(self.api_endpoint, timeout=1.0)
                 if response.status_code == 200:
                     data = response.json()
                     reading = SensorReading(
@@ -80,35 +136,81 @@ class WeightSensor:
             except Exception as e:
                 logger.error(f"Error reading sensor {self.sensor_id}: {e}")
                 return None
-        
+
         self.last_reading = reading
+        self._last_read_time = time.time()
         return reading
 
+    def read(self) -> Optional[SensorReading]:
+        """
+        Read current sensor value.
+
+        Hardware sensors with a running background poller return the
+        cached snapshot without blocking. Inline reads reuse the last
+        reading while it is younger than cache_ttl — scales update at
+        ~5 Hz physically, so per-frame callers at 30 fps would
+        otherwise issue ~6x redundant HTTP round-trips per update.
+
+        Returns:
+            SensorReading or None if error
+        """
+        if self._reader is not None:
+            return self.last_reading
+        if (self.last_reading is not None
+                and time.time() - self._last_read_time < self.cache_ttl):
+            return self.last_reading
+        return self._read_once()
+
 
 class SensorFusion:
     """
     Fuses sensor data with computer vision detections.
     """
     
-    def __init__(self, sensors: Optional[List[WeightSensor]] = None):
+    def __init__(
+        self,
+        sensors: Optional[List[WeightSensor]] = None,
+        batch_endpoint: Optional[str] = None
+    ):
         """
         Initialize sensor fusion system.
-        
+
         Args:
             sensors: List of WeightSensor instances
+            batch_endpoint: Optional multiplexed sensor API endpoint;
+                when set, get_all_readings fetches every sensor in one
+                POST (one network round-trip instead of one per sensor)
         """
         self.sensors: Dict[str, WeightSensor] = {}
-        
+        self.batch_endpoint = batch_endpoint
+        self._session = requests.Session() if batch_endpoint else None
+
+        # Lazily built pool for the non-batched path: overlaps the
+        # blocking per-sensor HTTP reads instead of serializing them
+        self._executor: Optional[ThreadPoolExecutor] = None
+
         if sensors:
             for sensor in sensors:
                 self.add_sensor(sensor)
-        
+
         logger.info(f"SensorFusion initialized ({len(self.sensors)} sensors)")
     
     def add_sensor(self, sensor: WeightSensor):
-        """Add a sensor to the fusion system."""
+        """Add a sensor to the fusion system and start its poller."""
         self.sensors[sensor.sensor_id] = sensor
+        sensor.start()
         logger.info(f"Added sensor {sensor.sensor_id}")
+
+    def shutdown(self):
+        """Stop all background sensor pollers."""
+        for sensor in self.sensors.values():
+            sensor.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+        logger.info("SensorFusion shut down")
     
     def get_sensor_reading(self, sensor_id: str) -> Optional[SensorReading]:
         """Get reading from specific sensor."""
@@ -155,8 +257,67 @@ class SensorFusion:
         
         return detections
     
+    def _read_batch(self) -> Optional[Dict[str, SensorReading]]:
+        """
+        Fetch all sensors through the multiplexed endpoint.
+
+        One POST with every sensor_id replaces N per-sensor requests,
+        amortizing the network round-trip across the fleet. Expects a
+        ``{'readings': {sensor_id: weight, ...}}`` response body.
+
+        Returns:
+            Readings dict, or None so the caller falls back to
+            per-sensor reads
+        """
+        try:
+            response = self._session.post(
+                self.batch_endpoint,
+                json={'sensor_ids': list(self.sensors)},
+                timeout=1.0
+            )
+            if response.status_code != 200:
+                logger.warning("Batch sensor read failed: %s", response.status_code)
+                return None
+            data = response.json()
+        except Exception as e:
+            logger.error("Error reading batch endpoint: %s", e)
+            return None
+
+        now = time.time()
+        readings = {}
+        for sensor_id, value in data.get('readings', {}).items():
+            sensor = self.sensors.get(sensor_id)
+            if sensor is None:
+                continue
+            reading = SensorReading(
+                sensor_id=sensor_id,
+                value=value,
+                timestamp=now
+            )
+            sensor.last_reading = reading
+            sensor._last_read_time = now
+            readings[sensor_id] = reading
+        return readings
+
     def get_all_readings(self) -> Dict[str, SensorReading]:
         """Get readings from all sensors."""
+        if self.batch_endpoint and self.sensors:
+            readings = self._read_batch()
+            if readings is not None:
+                return readings
+
+        # Overlap the blocking per-sensor reads; with a background
+        # poller running each read is already non-blocking, so the pool
+        # only matters for unstarted hardware sensors
+        if len(self.sensors) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=min(len(self.sensors), 16),
+                    thread_name_prefix='vk-sensor-read'
+                )
+            results = self._executor.map(WeightSensor.read, self.sensors.values())
+            return {r.sensor_id: r for r in results if r}
+
         readings = {}
         for sensor_id, sensor in self.sensors.items():
             reading = sensor.read()
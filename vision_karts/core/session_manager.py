@@ -4,26 +4,49 @@ Session Management Module
 Manages customer sessions from entry to exit in automated checkout systems.
 """
 
+import heapq
 import logging
+import sys
 import time
-import uuid
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import IntFlag
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# dataclass slots need Python 3.10; older interpreters fall back to
+# regular instances (setup.py supports 3.8+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-class SessionStatus(Enum):
-    """Session status enumeration."""
-    ACTIVE = "active"
-    EXITING = "exiting"
-    COMPLETED = "completed"
-    ABANDONED = "abandoned"
+# Interned field names for to_dict: every session dict shares the same
+# key objects (with cached hashes) instead of re-hashing fresh strings
+# in downstream JSON/analytics pipelines
+_SESSION_KEYS = tuple(map(sys.intern, (
+    'session_id', 'customer_id', 'entry_time', 'exit_time', 'duration',
+    'status', 'entry_camera', 'exit_camera', 'cart_id'
+)))
 
 
-@dataclass
+class SessionStatus(IntFlag):
+    """
+    Session status flags.
+
+    Bit-packed so status checks compile to int compares instead of the
+    Enum.__eq__ path, and composite masks (e.g. terminal states) test
+    with one & operation. Serialized form is the lowercased name.
+    """
+    ACTIVE = 1
+    EXITING = 2
+    COMPLETED = 4
+    ABANDONED = 8
+
+
+# Sessions in either terminal state, for one-mask membership tests
+_TERMINAL = SessionStatus.COMPLETED | SessionStatus.ABANDONED
+
+
+@dataclass(**_SLOTS)
 class CustomerSession:
     """Represents a customer shopping session."""
     session_id: str
@@ -44,21 +67,21 @@ class CustomerSession:
     @property
     def is_active(self) -> bool:
         """Check if session is active."""
-        return self.status == SessionStatus.ACTIVE
+        return bool(self.status & SessionStatus.ACTIVE)
     
     def to_dict(self) -> Dict:
         """Convert session to dictionary."""
-        return {
-            'session_id': self.session_id,
-            'customer_id': self.customer_id,
-            'entry_time': self.entry_time,
-            'exit_time': self.exit_time,
-            'duration': self.duration,
-            'status': self.status.value,
-            'entry_camera': self.entry_camera,
-            'exit_camera': self.exit_camera,
-            'cart_id': self.cart_id
-        }
+        return dict(zip(_SESSION_KEYS, (
+            self.session_id,
+            self.customer_id,
+            self.entry_time,
+            self.exit_time,
+            self.duration,
+            self.status.name.lower(),
+            self.entry_camera,
+            self.exit_camera,
+            self.cart_id
+        )))
 
 
 class SessionManager:
@@ -84,10 +107,40 @@ class SessionManager:
         # Maps session_id -> CustomerSession
         self.sessions: Dict[str, CustomerSession] = {}
         
-        # Maps customer_id -> session_id (for active sessions)
-        self.customer_to_session: Dict[str, str] = {}
-        
+        # Maps customer_id -> active CustomerSession; holding the
+        # object directly saves the id-indirection lookup on every
+        # create and customer query
+        self.customer_to_session: Dict[str, CustomerSession] = {}
+
+        # Incremental status bookkeeping: stats and the concurrency
+        # check read these instead of scanning every session, so
+        # create_session stays O(1) at the 1000-session cap
+        self._status_counts: Dict[SessionStatus, int] = {s: 0 for s in SessionStatus}
+        self._active_ids: set = set()
+
+        # Expiry indexes ordered by time: cleanup pops only what has
+        # actually aged out (O(k log N) for k expirations) instead of
+        # walking every retained session. Entries can go stale when a
+        # session changes status first; a recheck on pop skips them.
+        self._active_heap: List[Tuple[float, str]] = []
+        self._terminal_heap: List[Tuple[float, str]] = []
+
+        # Sequence suffix for session ids: time_ns plus a wrapping
+        # counter is unique without a urandom syscall per create, and
+        # the 20-char hex id hashes cheaper than a 36-char UUID string
+        self._id_counter = 0
+
         logger.info(f"SessionManager initialized (timeout={session_timeout}s)")
+
+    def _set_status(self, session: CustomerSession, status: SessionStatus):
+        """Transition a session's status, keeping the counters in sync."""
+        self._status_counts[session.status] -= 1
+        self._status_counts[status] += 1
+        session.status = status
+        if status == SessionStatus.ACTIVE:
+            self._active_ids.add(session.session_id)
+        else:
+            self._active_ids.discard(session.session_id)
     
     def create_session(
         self,
@@ -105,22 +158,20 @@ class SessionManager:
             CustomerSession instance
         """
         # Check if customer already has active session
-        if customer_id in self.customer_to_session:
-            existing_session_id = self.customer_to_session[customer_id]
-            existing_session = self.sessions.get(existing_session_id)
-            
-            if existing_session and existing_session.is_active:
-                logger.warning(f"Customer {customer_id} already has active session {existing_session_id}")
-                return existing_session
+        existing = self.customer_to_session.get(customer_id)
+        if existing is not None and existing.is_active:
+            logger.warning("Customer %s already has active session %s",
+                           customer_id, existing.session_id)
+            return existing
         
         # Check session limit
-        active_count = sum(1 for s in self.sessions.values() if s.is_active)
-        if active_count >= self.max_concurrent_sessions:
+        if len(self._active_ids) >= self.max_concurrent_sessions:
             logger.error(f"Maximum concurrent sessions reached ({self.max_concurrent_sessions})")
             raise RuntimeError("Maximum concurrent sessions reached")
         
         # Create new session
-        session_id = str(uuid.uuid4())
+        session_id = f"{time.time_ns():x}{self._id_counter:04x}"
+        self._id_counter = (self._id_counter + 1) & 0xFFFF
         session = CustomerSession(
             session_id=session_id,
             customer_id=customer_id,
@@ -128,8 +179,11 @@ class SessionManager:
         )
         
         self.sessions[session_id] = session
-        self.customer_to_session[customer_id] = session_id
-        
+        self.customer_to_session[customer_id] = session
+        self._status_counts[SessionStatus.ACTIVE] += 1
+        self._active_ids.add(session_id)
+        heapq.heappush(self._active_heap, (session.entry_time, session_id))
+
         logger.info(f"Created session {session_id} for customer {customer_id}")
         return session
     
@@ -139,10 +193,7 @@ class SessionManager:
     
     def get_session_by_customer(self, customer_id: str) -> Optional[CustomerSession]:
         """Get active session for a customer."""
-        session_id = self.customer_to_session.get(customer_id)
-        if session_id:
-            return self.sessions.get(session_id)
-        return None
+        return self.customer_to_session.get(customer_id)
     
     def update_session_cart(self, session_id: str, cart_id: str):
         """Update session with cart ID."""
@@ -165,7 +216,7 @@ class SessionManager:
         """
         session = self.get_session(session_id)
         if session:
-            session.status = SessionStatus.EXITING
+            self._set_status(session, SessionStatus.EXITING)
             session.exit_camera = exit_camera
             logger.info(f"Session {session_id} marked as exiting")
     
@@ -189,13 +240,13 @@ class SessionManager:
             raise ValueError(f"Session {session_id} not found")
         
         session.exit_time = time.time()
-        session.status = SessionStatus.COMPLETED
+        self._set_status(session, SessionStatus.COMPLETED)
         session.exit_camera = exit_camera
-        
+        heapq.heappush(self._terminal_heap, (session.exit_time, session_id))
+
         # Remove from active customer mapping
-        if session.customer_id in self.customer_to_session:
-            del self.customer_to_session[session.customer_id]
-        
+        self.customer_to_session.pop(session.customer_id, None)
+
         logger.info(f"Completed session {session_id} (duration: {session.duration:.1f}s)")
         return session
     
@@ -203,49 +254,53 @@ class SessionManager:
         """Mark session as abandoned."""
         session = self.get_session(session_id)
         if session:
-            session.status = SessionStatus.ABANDONED
+            self._set_status(session, SessionStatus.ABANDONED)
             session.exit_time = time.time()
-            
-            if session.customer_id in self.customer_to_session:
-                del self.customer_to_session[session.customer_id]
-            
+            heapq.heappush(self._terminal_heap, (session.exit_time, session_id))
+
+            self.customer_to_session.pop(session.customer_id, None)
+
             logger.info(f"Abandoned session {session_id}")
     
     def cleanup_expired_sessions(self):
         """Remove expired or abandoned sessions."""
         current_time = time.time()
-        sessions_to_remove = []
-        
-        for session_id, session in self.sessions.items():
-            # Check timeout
-            if session.is_active and current_time - session.entry_time > self.session_timeout:
-                logger.warning(f"Session {session_id} expired (timeout)")
-                self.abandon_session(session_id)
-            
-            # Remove old completed/abandoned sessions (older than 24 hours)
-            if session.status in [SessionStatus.COMPLETED, SessionStatus.ABANDONED]:
-                if session.exit_time and current_time - session.exit_time > 86400:  # 24 hours
-                    sessions_to_remove.append(session_id)
-        
-        for session_id in sessions_to_remove:
+
+        # Abandon timed-out active sessions: pop the entry-time heap
+        # until its head is inside the timeout window
+        while (self._active_heap and
+               self._active_heap[0][0] + self.session_timeout < current_time):
+            entry_time, session_id = heapq.heappop(self._active_heap)
+            session = self.sessions.get(session_id)
+            if (session is None or session.status != SessionStatus.ACTIVE
+                    or session.entry_time != entry_time):
+                continue  # stale heap entry, session moved on
+            logger.warning(f"Session {session_id} expired (timeout)")
+            self.abandon_session(session_id)
+
+        # Remove old completed/abandoned sessions (older than 24 hours)
+        while (self._terminal_heap and
+               self._terminal_heap[0][0] + 86400 < current_time):
+            exit_time, session_id = heapq.heappop(self._terminal_heap)
+            session = self.sessions.get(session_id)
+            if (session is None or session.exit_time != exit_time
+                    or not session.status & _TERMINAL):
+                continue
+            self._status_counts[session.status] -= 1
             del self.sessions[session_id]
             logger.debug(f"Removed old session {session_id}")
-    
+
     def get_active_sessions(self) -> List[CustomerSession]:
         """Get all active sessions."""
-        return [s for s in self.sessions.values() if s.is_active]
-    
+        return [self.sessions[sid] for sid in self._active_ids]
+
     def get_session_stats(self) -> Dict:
-        """Get session statistics."""
-        active = len(self.get_active_sessions())
-        exiting = sum(1 for s in self.sessions.values() if s.status == SessionStatus.EXITING)
-        completed = sum(1 for s in self.sessions.values() if s.status == SessionStatus.COMPLETED)
-        abandoned = sum(1 for s in self.sessions.values() if s.status == SessionStatus.ABANDONED)
-        
+        """Get session statistics (O(1) from the status counters)."""
+        counts = self._status_counts
         return {
             'total_sessions': len(self.sessions),
-            'active': active,
-            'exiting': exiting,
-            'completed': completed,
-            'abandoned': abandoned
+            'active': counts[SessionStatus.ACTIVE],
+            'exiting': counts[SessionStatus.EXITING],
+            'completed': counts[SessionStatus.COMPLETED],
+            'abandoned': counts[SessionStatus.ABANDONED]
         }
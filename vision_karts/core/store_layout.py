@@ -5,26 +5,46 @@ Manages store layout, zones, and spatial mapping for tracking.
 """
 
 import logging
+import sys
+import numpy as np
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 import yaml
 
+from ..utils.serialization import dumps_json, loads_json
+
+# libyaml-backed parser when PyYAML was built against it; an order of
+# magnitude faster than the pure-Python SafeLoader on large layouts
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# GEOS-backed spatial index for polygon zones: tree query narrows the
+# candidates in O(log N), exact containment runs in C
+try:
+    import shapely.geometry as sg
+    from shapely.strtree import STRtree
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# dataclass slots need Python 3.10; older interpreters fall back to
+# regular instances (setup.py supports 3.8+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
+@dataclass(**_SLOTS)
 class Zone:
     """Represents a zone in the store."""
     name: str
     zone_type: str  # 'entrance', 'aisle', 'shelf', 'checkout', 'exit'
     bounds: List[List[float]]  # [[x1, y1], [x2, y2]] or polygon
-    camera_ids: List[str] = None
-    
-    def __post_init__(self):
-        if self.camera_ids is None:
-            self.camera_ids = []
-    
+    camera_ids: List[str] = field(default_factory=list)
+
     def contains_point(self, x: float, y: float) -> bool:
         """
         Check if point is within zone bounds.
@@ -49,17 +69,13 @@ class Zone:
         return True  # Placeholder for polygon implementation
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Shelf:
     """Represents a shelf with product locations."""
     shelf_id: str
     zone_name: str
     position: Tuple[float, float]
-    products: List[str] = None
-    
-    def __post_init__(self):
-        if self.products is None:
-            self.products = []
+    products: List[str] = field(default_factory=list)
 
 
 class StoreLayout:
@@ -77,7 +93,20 @@ class StoreLayout:
         self.zones: Dict[str, Zone] = {}
         self.shelves: Dict[str, Shelf] = {}
         self.camera_positions: Dict[str, Tuple[float, float]] = {}
-        
+
+        # Rectangle zones packed as an (N, 4) [x1, y1, x2, y2] array so
+        # point-in-zone tests run as one vectorized comparison instead
+        # of a Python loop per zone; rebuilt lazily after zone changes
+        self._zone_bounds = np.empty((0, 4), np.float32)
+        self._zone_names: List[str] = []
+        self._other_zones: List[Zone] = []  # non-rectangle fallbacks
+        self._zones_dirty = False
+
+        # Reverse indices: per-frame "shelves near this customer" and
+        # zone-type queries become dict lookups instead of full scans
+        self._shelves_by_zone: Dict[str, List[Shelf]] = {}
+        self._zones_by_type: Dict[str, List[Zone]] = {}
+
         if layout_file and Path(layout_file).exists():
             self.load_layout(layout_file)
         
@@ -86,31 +115,36 @@ class StoreLayout:
     def load_layout(self, layout_file: str):
         """Load layout from YAML file."""
         try:
-            with open(layout_file, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            # Load zones
+            config = self._read_layout_config(layout_file)
+
+            # Load zones (names and types repeat across thousands of
+            # downstream records; interning shares one string object
+            # per distinct value with its hash cached)
             if 'zones' in config:
                 for zone_data in config['zones']:
                     zone = Zone(
-                        name=zone_data['name'],
-                        zone_type=zone_data.get('type', 'general'),
+                        name=sys.intern(zone_data['name']),
+                        zone_type=sys.intern(zone_data.get('type', 'general')),
                         bounds=zone_data['bounds'],
                         camera_ids=zone_data.get('cameras', [])
                     )
                     self.zones[zone.name] = zone
-            
+                self._zones_dirty = True
+
             # Load shelves
             if 'shelves' in config:
                 for shelf_data in config['shelves']:
                     shelf = Shelf(
-                        shelf_id=shelf_data['id'],
-                        zone_name=shelf_data.get('zone', ''),
+                        shelf_id=sys.intern(shelf_data['id']),
+                        zone_name=sys.intern(shelf_data.get('zone', '')),
                         position=tuple(shelf_data['position']),
                         products=shelf_data.get('products', [])
                     )
                     self.shelves[shelf.shelf_id] = shelf
-            
+                    self._shelves_by_zone.setdefault(
+                        shelf.zone_name, []
+                    ).append(shelf)
+
             # Load camera positions
             if 'cameras' in config:
                 for cam_data in config['cameras']:
@@ -120,7 +154,39 @@ class StoreLayout:
         
         except Exception as e:
             logger.error(f"Error loading layout: {e}", exc_info=True)
-    
+
+    def _read_layout_config(self, layout_file: str) -> Dict:
+        """
+        Parse the layout file, going through a JSON snapshot when valid.
+
+        Layouts are edited rarely but loaded on every process start, so
+        the parsed YAML is mirrored into a sibling ``.cache.json`` keyed
+        by the source file's mtime. A matching snapshot skips the YAML
+        parse entirely; a stale or missing one is rewritten after
+        parsing. Snapshot failures fall through to plain YAML.
+        """
+        path = Path(layout_file)
+        mtime = path.stat().st_mtime
+        cache_path = path.with_suffix(path.suffix + '.cache.json')
+
+        if cache_path.exists():
+            try:
+                snapshot = loads_json(cache_path.read_bytes())
+                if snapshot.get('__mtime') == mtime:
+                    return snapshot['config']
+            except Exception:
+                logger.debug("Ignoring unreadable layout cache %s", cache_path)
+
+        with open(layout_file, 'r') as f:
+            config = yaml.load(f, Loader=_YamlLoader)
+
+        try:
+            cache_path.write_bytes(dumps_json({'__mtime': mtime, 'config': config}))
+        except OSError as e:
+            logger.debug("Could not write layout cache %s: %s", cache_path, e)
+
+        return config
+
     def add_zone(
         self,
         name: str,
@@ -136,7 +202,37 @@ class StoreLayout:
             camera_ids=camera_ids or []
         )
         self.zones[name] = zone
+        self._zones_dirty = True
         logger.info(f"Added zone: {name}")
+
+    def _rebuild_zone_index(self):
+        """Pack rectangle zone bounds into the lookup array."""
+        bounds = []
+        names = []
+        others = []
+        by_type: Dict[str, List[Zone]] = {}
+        for zone in self.zones.values():
+            if len(zone.bounds) == 2:
+                (x1, y1), (x2, y2) = zone.bounds
+                bounds.append((x1, y1, x2, y2))
+                names.append(zone.name)
+            else:
+                others.append(zone)
+            by_type.setdefault(zone.zone_type, []).append(zone)
+        self._zone_bounds = np.array(bounds, np.float32).reshape(-1, 4)
+        self._zone_names = names
+        self._other_zones = others
+        self._zones_by_type = by_type
+
+        # Polygon zones get an STRtree when shapely is present; without
+        # it they stay on the per-zone placeholder check
+        self._poly_tree = None
+        self._poly_geoms: List = []
+        if SHAPELY_AVAILABLE and others:
+            self._poly_geoms = [sg.Polygon(z.bounds) for z in others]
+            self._poly_tree = STRtree(self._poly_geoms)
+
+        self._zones_dirty = False
     
     def get_zone(self, name: str) -> Optional[Zone]:
         """Get zone by name."""
@@ -153,14 +249,81 @@ class StoreLayout:
         Returns:
             Zone containing point or None
         """
-        for zone in self.zones.values():
+        if self._zones_dirty:
+            self._rebuild_zone_index()
+
+        # One vectorized containment test across all rectangle zones
+        if len(self._zone_names):
+            b = self._zone_bounds
+            mask = (b[:, 0] <= x) & (x <= b[:, 2]) & (b[:, 1] <= y) & (y <= b[:, 3])
+            idx = int(np.argmax(mask))
+            if mask[idx]:
+                return self.zones[self._zone_names[idx]]
+
+        return self._find_polygon_zone(x, y)
+
+    def _find_polygon_zone(self, x: float, y: float) -> Optional[Zone]:
+        """Resolve a point against the non-rectangle zones."""
+        if self._poly_tree is not None:
+            pt = sg.Point(x, y)
+            for cand in self._poly_tree.query(pt):
+                # shapely 2.x returns indices, 1.x returns geometries
+                idx = (int(cand) if isinstance(cand, (int, np.integer))
+                       else self._poly_geoms.index(cand))
+                if self._poly_geoms[idx].covers(pt):
+                    return self._other_zones[idx]
+            return None
+
+        for zone in self._other_zones:
             if zone.contains_point(x, y):
                 return zone
         return None
-    
+
+    def find_zones_for_points(
+        self,
+        points: List[Tuple[float, float]]
+    ) -> List[Optional[Zone]]:
+        """
+        Find containing zones for a batch of points.
+
+        Processes a whole frame of track centroids with one broadcast
+        comparison against the packed bounds array instead of a Python
+        loop per (point, zone) pair.
+
+        Args:
+            points: List of (x, y) coordinates
+
+        Returns:
+            Per-point Zone or None, in input order
+        """
+        if not points:
+            return []
+        if self._zones_dirty:
+            self._rebuild_zone_index()
+
+        results: List[Optional[Zone]] = [None] * len(points)
+        if len(self._zone_names):
+            pts = np.asarray(points, np.float32)
+            b = self._zone_bounds
+            xs = pts[:, 0:1]
+            ys = pts[:, 1:2]
+            mask = (b[:, 0] <= xs) & (xs <= b[:, 2]) & (b[:, 1] <= ys) & (ys <= b[:, 3])
+            hit = mask.any(axis=1)
+            first = mask.argmax(axis=1)
+            for i in np.nonzero(hit)[0]:
+                results[i] = self.zones[self._zone_names[first[i]]]
+
+        if self._other_zones:
+            for i, (x, y) in enumerate(points):
+                if results[i] is None:
+                    results[i] = self._find_polygon_zone(x, y)
+        return results
+
     def get_zones_by_type(self, zone_type: str) -> List[Zone]:
         """Get all zones of a specific type."""
-        return [z for z in self.zones.values() if z.zone_type == zone_type]
+        if self._zones_dirty:
+            self._rebuild_zone_index()
+        return list(self._zones_by_type.get(zone_type, ()))
     
     def add_shelf(
         self,
@@ -176,7 +339,11 @@ class StoreLayout:
             position=position,
             products=products or []
         )
+        old = self.shelves.get(shelf_id)
+        if old is not None:
+            self._shelves_by_zone[old.zone_name].remove(old)
         self.shelves[shelf_id] = shelf
+        self._shelves_by_zone.setdefault(zone_name, []).append(shelf)
         logger.info(f"Added shelf: {shelf_id}")
     
     def get_shelf(self, shelf_id: str) -> Optional[Shelf]:
@@ -185,7 +352,7 @@ class StoreLayout:
     
     def get_shelves_in_zone(self, zone_name: str) -> List[Shelf]:
         """Get all shelves in a zone."""
-        return [s for s in self.shelves.values() if s.zone_name == zone_name]
+        return list(self._shelves_by_zone.get(zone_name, ()))
     
     def set_camera_position(self, camera_id: str, position: Tuple[float, float]):
         """Set camera position in store coordinates."""
@@ -9,15 +9,78 @@ import cv2
 import numpy as np
 import logging
 import threading
-import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Callable, Tuple
 from pathlib import Path
 from collections import deque
 
+from ._fast import filter_detections
+
 logger = logging.getLogger(__name__)
 
 
+class SPSCFrameRing:
+    """
+    Single-producer/single-consumer frame ring buffer.
+
+    The capture thread is the only writer of the tail index and the
+    processing thread the only writer of the head index; each index
+    store is a single atomic bytecode under the GIL, so the handoff
+    needs no mutex. Compared to queue.Queue this removes two lock
+    acquire/release pairs per frame, and a full ring drops the oldest
+    frame with one head bump instead of the double get/put dance under
+    the queue lock. The Event only backs the blocking-get path.
+    """
+
+    def __init__(self, capacity: int):
+        # One slot stays empty so a full ring is distinguishable from
+        # an empty one by the indices alone
+        self._n = capacity + 1
+        self._buf = [None] * self._n
+        self._head = 0  # consumer index
+        self._tail = 0  # producer index
+        self._not_empty = threading.Event()
+
+    def __len__(self) -> int:
+        return (self._tail - self._head) % self._n
+
+    def put(self, item):
+        """Producer-side enqueue; drops the oldest item when full."""
+        tail = self._tail
+        nxt = (tail + 1) % self._n
+        if nxt == self._head:
+            # Drop-oldest: bump head past the stale slot. Racing a
+            # concurrent consumer pop here costs at worst one extra
+            # dropped frame, which the stream absorbs anyway.
+            self._head = (self._head + 1) % self._n
+        self._buf[tail] = item
+        self._tail = nxt
+        self._not_empty.set()
+
+    def get(self, timeout: Optional[float] = None):
+        """Consumer-side dequeue; returns None on timeout."""
+        if self._head == self._tail:
+            self._not_empty.clear()
+            # Re-check: the producer may have published between the
+            # emptiness test and the clear
+            if self._head == self._tail:
+                if not self._not_empty.wait(timeout):
+                    return None
+        head = self._head
+        item = self._buf[head]
+        self._buf[head] = None
+        self._head = (head + 1) % self._n
+        return item
+
+    def clear(self):
+        """Drop all buffered items (call with both threads stopped)."""
+        self._buf = [None] * self._n
+        self._head = 0
+        self._tail = 0
+        self._not_empty.clear()
+
+
 class VideoProcessor:
     """
     Real-time video stream processor with frame buffering and multi-threading support.
@@ -28,31 +91,51 @@ class VideoProcessor:
         camera_id: int = 0,
         fps: int = 30,
         frame_buffer_size: int = 10,
-        processing_callback: Optional[Callable] = None
+        processing_callback: Optional[Callable] = None,
+        workers: int = 2
     ):
         """
         Initialize video processor.
-        
+
         Args:
             camera_id: Camera device ID or video file path
             fps: Target frames per second
             frame_buffer_size: Size of frame buffer queue
             processing_callback: Optional callback function(frame, timestamp) -> results
+            workers: Processing pool size when a callback is set. Two
+                per camera lets CPU pre/postprocess of one frame
+                overlap GPU inference of the next (torch/onnxruntime
+                release the GIL during inference)
         """
         self.camera_id = camera_id
         self.fps = fps
         self.frame_buffer_size = frame_buffer_size
         self.processing_callback = processing_callback
-        
+        self.workers = workers
+
         self.cap: Optional[cv2.VideoCapture] = None
-        self.frame_queue = queue.Queue(maxsize=frame_buffer_size)
+        self.frame_queue = SPSCFrameRing(frame_buffer_size)
         self.running = False
-        self.processing_thread: Optional[threading.Thread] = None
         self.capture_thread: Optional[threading.Thread] = None
+
+        # Callback-mode processing pool with a semaphore capping frames
+        # in flight; both created in start()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._inflight: Optional[threading.BoundedSemaphore] = None
         
         self.frame_count = 0
         self.fps_counter = deque(maxlen=30)
         self.last_fps_time = time.time()
+
+        # Approximate queue depth maintained around put/get: telemetry
+        # reads this instead of Queue.qsize(), whose mutex would briefly
+        # stall the capture thread under a fast-polling stats loop
+        self._approx_qsize = 0
+
+        # Recycled decode targets, allocated in start() once the frame
+        # size is known; None when the source doesn't report dimensions
+        self._frame_bufs: Optional[List[np.ndarray]] = None
+        self._buf_idx = 0
         
         logger.info(f"VideoProcessor initialized (camera_id={camera_id}, fps={fps})")
     
@@ -74,89 +157,123 @@ class VideoProcessor:
         # Set camera properties
         self.cap.set(cv2.CAP_PROP_FPS, self.fps)
         self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce latency
-        
+
+        # Preallocate the decode pool: cap.read() allocates a fresh
+        # H*W*3 array per frame (~180 MB/s of churn at 1080p/30fps);
+        # retrieve() into recycled buffers caps that at a fixed pool.
+        # Two spare slots beyond the ring keep the frame being written
+        # and the one being processed from colliding with queued ones.
+        w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if w > 0 and h > 0:
+            self._frame_bufs = [
+                np.empty((h, w, 3), np.uint8)
+                for _ in range(self.frame_buffer_size + 2)
+            ]
+        else:
+            self._frame_bufs = None
+        self._buf_idx = 0
+
         self.running = True
-        
+
+        # Processing pool: frames are dispatched straight from the
+        # capture thread, with at most frame_buffer_size in flight so a
+        # slow callback sheds frames instead of queueing without bound
+        if self.processing_callback:
+            self._inflight = threading.BoundedSemaphore(self.frame_buffer_size)
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='vk-frame'
+            )
+
         # Start capture thread
         self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
         self.capture_thread.start()
-        
-        # Start processing thread
-        if self.processing_callback:
-            self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
-            self.processing_thread.start()
-        
+
         logger.info("Video processor started")
-    
+
     def stop(self):
         """Stop video capture and processing."""
         self.running = False
-        
+
         if self.capture_thread:
             self.capture_thread.join(timeout=2.0)
-        
-        if self.processing_thread:
-            self.processing_thread.join(timeout=2.0)
-        
+
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._inflight = None
+
         if self.cap:
             self.cap.release()
         
-        # Clear queue
-        while not self.frame_queue.empty():
-            try:
-                self.frame_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Clear buffered frames (both threads have stopped)
+        self.frame_queue.clear()
+        self._approx_qsize = 0
         
         logger.info("Video processor stopped")
     
     def _capture_loop(self):
-        """Capture frames from camera in separate thread."""
+        """
+        Capture frames from camera in separate thread.
+
+        Demux (grab) and decode (retrieve) are split, and decode lands
+        in a rotating pool of preallocated buffers. Pool slots recycle
+        after frame_buffer_size + 2 frames, so processing callbacks
+        that retain a frame beyond their own invocation must copy it.
+        """
         while self.running:
-            ret, frame = self.cap.read()
-            
-            if not ret:
-                logger.warning("Failed to read frame from camera")
-                time.sleep(0.1)
-                continue
-            
-            timestamp = time.time()
-            
-            # Add to queue (non-blocking, drop old frames if queue full)
-            try:
-                self.frame_queue.put_nowait((frame, timestamp))
-            except queue.Full:
-                # Drop oldest frame
-                try:
-                    self.frame_queue.get_nowait()
-                    self.frame_queue.put_nowait((frame, timestamp))
-                except queue.Empty:
-                    pass
+            if self._frame_bufs is not None:
+                if not self.cap.grab():
+                    logger.warning("Failed to read frame from camera")
+                    time.sleep(0.1)
+                    continue
+                timestamp = time.time()
+                ret, frame = self.cap.retrieve(self._frame_bufs[self._buf_idx])
+                if not ret:
+                    logger.warning("Failed to decode frame from camera")
+                    continue
+                self._buf_idx = (self._buf_idx + 1) % len(self._frame_bufs)
+            else:
+                ret, frame = self.cap.read()
+
+                if not ret:
+                    logger.warning("Failed to read frame from camera")
+                    time.sleep(0.1)
+                    continue
+
+                timestamp = time.time()
             
-            # Update FPS counter
+            if self._pool is not None:
+                # Callback mode: dispatch straight to the pool. The
+                # ring is single-consumer, so pool workers take the
+                # frame as an argument rather than popping it. A failed
+                # acquire means frame_buffer_size frames are already in
+                # flight — shed this one rather than queue it.
+                if self._inflight.acquire(blocking=False):
+                    self._pool.submit(self._run_callback, frame, timestamp)
+            else:
+                # Pull mode: hand off to the ring for get_frame()
+                # (lock-free; drops oldest when full)
+                self.frame_queue.put((frame, timestamp))
+                self._approx_qsize = len(self.frame_queue)
+
+            # Update FPS counter, reusing the frame timestamp rather
+            # than paying a second clock read per iteration
             self.frame_count += 1
-            current_time = time.time()
-            if current_time - self.last_fps_time >= 1.0:
-                actual_fps = len(self.fps_counter) / (current_time - self.last_fps_time)
+            if timestamp - self.last_fps_time >= 1.0:
+                actual_fps = len(self.fps_counter) / (timestamp - self.last_fps_time)
                 self.fps_counter.append(actual_fps)
-                self.last_fps_time = current_time
+                self.last_fps_time = timestamp
     
-    def _processing_loop(self):
-        """Process frames in separate thread."""
-        while self.running:
-            try:
-                frame, timestamp = self.frame_queue.get(timeout=1.0)
-                
-                if self.processing_callback:
-                    try:
-                        results = self.processing_callback(frame, timestamp)
-                        # Results can be handled by callback or stored
-                    except Exception as e:
-                        logger.error(f"Error in processing callback: {e}", exc_info=True)
-                
-                self.frame_queue.task_done()
-            except queue.Empty:
-                continue
+    def _run_callback(self, frame: np.ndarray, timestamp: float):
+        """Run the processing callback on a pool worker."""
+        try:
+            results = self.processing_callback(frame, timestamp)
+            # Results can be handled by callback or stored
+        except Exception:
+            logger.error("Error in processing callback", exc_info=True)
+        finally:
+            self._inflight.release()
     
     def get_frame(self, timeout: float = 1.0) -> Optional[Tuple[np.ndarray, float]]:
         """
@@ -168,10 +285,10 @@ class VideoProcessor:
         Returns:
             Tuple of (frame, timestamp) or None if timeout
         """
-        try:
-            return self.frame_queue.get(timeout=timeout)
-        except queue.Empty:
-            return None
+        item = self.frame_queue.get(timeout=timeout)
+        if item is not None:
+            self._approx_qsize = len(self.frame_queue)
+        return item
     
     def get_current_fps(self) -> float:
         """Get current frames per second."""
@@ -211,7 +328,11 @@ class FrameProcessor:
         self.product_detector = product_detector
         self.customer_tracker = customer_tracker
         self.confidence_threshold = confidence_threshold
-        
+
+        # Trigger the one-off numba compile (cached on disk) here
+        # rather than on the first live frame
+        filter_detections(np.zeros(1, np.float32), confidence_threshold)
+
         logger.info("FrameProcessor initialized")
     
     def process_frame(
@@ -239,22 +360,27 @@ class FrameProcessor:
             'customers': []
         }
         
-        # Detect products
+        # Detect products; the confidence cut runs on a packed score
+        # column through the compiled kernel instead of a dict-compare
+        # per box in the interpreter
         try:
             detections, _ = self.product_detector.detect(frame, return_image=False)
-            results['detections'] = [
-                d for d in detections
-                if d['confidence'] >= self.confidence_threshold
-            ]
-        except Exception as e:
-            logger.error(f"Error in product detection: {e}", exc_info=True)
-        
+            if detections:
+                scores = np.fromiter(
+                    (d['confidence'] for d in detections),
+                    np.float32, len(detections)
+                )
+                keep = filter_detections(scores, self.confidence_threshold)
+                results['detections'] = [detections[i] for i in keep]
+        except Exception:
+            logger.error("Error in product detection", exc_info=True)
+
         # Track customers if tracker available
         if self.customer_tracker:
             try:
                 customers = self.customer_tracker.track_customers(frame)
                 results['customers'] = customers
-            except Exception as e:
-                logger.error(f"Error in customer tracking: {e}", exc_info=True)
+            except Exception:
+                logger.error("Error in customer tracking", exc_info=True)
         
         return results
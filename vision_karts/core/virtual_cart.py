@@ -5,115 +5,210 @@ Manages per-customer virtual shopping carts with real-time updates.
 """
 
 import logging
+import sys
 import time
+import numpy as np
 from typing import List, Dict, Optional, Set, Callable
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
 
+from ._fast import cart_total
+
 logger = logging.getLogger(__name__)
 
+# Initial per-cart row capacity; arrays double when a cart outgrows it
+_INITIAL_ROWS = 64
+
 
 @dataclass
 class CartItem:
-    """Represents an item in a virtual cart."""
+    """
+    Read-only view of one cart row.
+
+    Cart contents live column-wise inside VirtualCart; these views are
+    materialized on demand for callers that want per-item objects.
+    Mutating a view does not write back to the cart.
+    """
     product_name: str
     quantity: int = 1
     unit_price: float = 0.0
-    first_detected: float = field(default_factory=time.time)
-    last_updated: float = field(default_factory=time.time)
-    confidence_scores: List[float] = field(default_factory=list)
-    
+    first_detected: float = 0.0
+    last_updated: float = 0.0
+    avg_confidence: float = 0.0
+
     @property
     def total_price(self) -> float:
         """Calculate total price for this item."""
         return self.unit_price * self.quantity
-    
-    @property
-    def avg_confidence(self) -> float:
-        """Calculate average confidence score."""
-        if not self.confidence_scores:
-            return 0.0
-        return sum(self.confidence_scores) / len(self.confidence_scores)
 
 
-@dataclass
 class VirtualCart:
-    """Virtual shopping cart for a customer."""
-    customer_id: str
-    session_id: str
-    created_at: float = field(default_factory=time.time)
-    last_updated: float = field(default_factory=time.time)
-    items: Dict[str, CartItem] = field(default_factory=dict)
-    total_amount: float = 0.0
-    
+    """
+    Virtual shopping cart for a customer.
+
+    Items are stored structure-of-arrays: parallel numpy columns for
+    quantity, unit price, confidence running sum/count and timestamps,
+    with a name -> row dict for lookup. Recalculating the total is one
+    dot product over contiguous memory instead of a Python generator
+    over per-item objects, and summaries across many carts stay
+    vectorized. Confidence is kept as (sum, count) rather than a list
+    per item, so averages are O(1) with no per-detection allocation.
+    """
+
+    def __init__(self, customer_id: str, session_id: str):
+        self.customer_id = customer_id
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_updated = self.created_at
+        self.total_amount = 0.0
+
+        # Set by VirtualCartManager so totals fold into its aggregate
+        # arrays on the write path; standalone carts leave it None
+        self._on_change: Optional[Callable] = None
+
+        self._name_to_row: Dict[str, int] = {}
+        self._names: List[str] = []
+        cap = _INITIAL_ROWS
+        self._qty = np.zeros(cap, np.int32)
+        self._price = np.zeros(cap, np.float32)
+        self._conf_sum = np.zeros(cap, np.float32)
+        self._conf_n = np.zeros(cap, np.int32)
+        self._first = np.zeros(cap, np.float64)
+        self._row_updated = np.zeros(cap, np.float64)
+
+    _COLUMNS = ('_qty', '_price', '_conf_sum', '_conf_n', '_first', '_row_updated')
+
+    def _grow(self):
+        """Double the row capacity of every column."""
+        cap = len(self._qty) * 2
+        for name in self._COLUMNS:
+            setattr(self, name, np.resize(getattr(self, name), cap))
+
+    def _remove_row(self, row: int):
+        """Swap-remove a row, keeping the columns dense."""
+        last = len(self._names) - 1
+        name = self._names[row]
+        if row != last:
+            moved = self._names[last]
+            for col in self._COLUMNS:
+                arr = getattr(self, col)
+                arr[row] = arr[last]
+            self._names[row] = moved
+            self._name_to_row[moved] = row
+        self._names.pop()
+        del self._name_to_row[name]
+
+    @property
+    def items(self) -> Dict[str, CartItem]:
+        """Per-item views keyed by product name (built on demand)."""
+        out = {}
+        for name, row in self._name_to_row.items():
+            conf_n = int(self._conf_n[row])
+            out[name] = CartItem(
+                product_name=name,
+                quantity=int(self._qty[row]),
+                unit_price=float(self._price[row]),
+                first_detected=float(self._first[row]),
+                last_updated=float(self._row_updated[row]),
+                avg_confidence=float(self._conf_sum[row]) / conf_n if conf_n else 0.0
+            )
+        return out
+
+    @property
+    def item_count(self) -> int:
+        """Total quantity across all items."""
+        return int(self._qty[:len(self._names)].sum())
+
     def add_item(
         self,
         product_name: str,
         unit_price: float,
-        confidence: float = 1.0
+        confidence: float = 1.0,
+        timestamp: Optional[float] = None
     ):
-        """Add or update an item in the cart."""
-        if product_name in self.items:
-            # Update existing item
-            item = self.items[product_name]
-            item.quantity += 1
-            item.confidence_scores.append(confidence)
-            item.last_updated = time.time()
-        else:
-            # Add new item
-            self.items[product_name] = CartItem(
-                product_name=product_name,
-                quantity=1,
-                unit_price=unit_price,
-                confidence_scores=[confidence]
-            )
-        
-        self.last_updated = time.time()
+        """Add or update an item in the cart.
+
+        Batch callers can pass one timestamp for the whole batch to
+        avoid a clock read per detection.
+        """
+        now = timestamp if timestamp is not None else time.time()
+        row = self._name_to_row.get(product_name)
+        if row is None:
+            row = len(self._names)
+            if row == len(self._qty):
+                self._grow()
+            self._name_to_row[product_name] = row
+            self._names.append(product_name)
+            self._qty[row] = 0
+            self._price[row] = unit_price
+            self._conf_sum[row] = 0.0
+            self._conf_n[row] = 0
+            self._first[row] = now
+
+        self._qty[row] += 1
+        self._conf_sum[row] += confidence
+        self._conf_n[row] += 1
+        self._row_updated[row] = now
+        self.last_updated = now
         self._recalculate_total()
-    
-    def remove_item(self, product_name: str, quantity: int = 1):
+
+    def remove_item(
+        self,
+        product_name: str,
+        quantity: int = 1,
+        timestamp: Optional[float] = None
+    ):
         """Remove items from cart."""
-        if product_name not in self.items:
+        row = self._name_to_row.get(product_name)
+        if row is None:
             return
-        
-        item = self.items[product_name]
-        item.quantity = max(0, item.quantity - quantity)
-        
-        if item.quantity == 0:
-            del self.items[product_name]
-        
-        self.last_updated = time.time()
+
+        self._qty[row] = max(0, int(self._qty[row]) - quantity)
+
+        if self._qty[row] == 0:
+            self._remove_row(row)
+
+        self.last_updated = timestamp if timestamp is not None else time.time()
         self._recalculate_total()
-    
+
     def clear(self):
         """Clear all items from cart."""
-        self.items.clear()
-        self.total_amount = 0.0
+        self._name_to_row.clear()
+        self._names.clear()
         self.last_updated = time.time()
-    
+        self._recalculate_total()
+
     def _recalculate_total(self):
-        """Recalculate total cart amount."""
-        self.total_amount = sum(item.total_price for item in self.items.values())
-    
+        """Recalculate total cart amount (compiled loop over the rows)."""
+        n = len(self._names)
+        self.total_amount = float(cart_total(self._qty, self._price, n))
+        if self._on_change is not None:
+            self._on_change(self)
+
     def to_dict(self) -> Dict:
         """Convert cart to dictionary."""
+        n = len(self._names)
+        qty = self._qty[:n]
+        price = self._price[:n]
+        conf_n = np.maximum(self._conf_n[:n], 1)
+        avg_conf = self._conf_sum[:n] / conf_n
         return {
             'customer_id': self.customer_id,
             'session_id': self.session_id,
             'created_at': self.created_at,
             'last_updated': self.last_updated,
-            'item_count': sum(item.quantity for item in self.items.values()),
+            'item_count': int(qty.sum()),
             'total_amount': round(self.total_amount, 2),
             'items': [
                 {
-                    'product': item.product_name,
-                    'quantity': item.quantity,
-                    'unit_price': item.unit_price,
-                    'total': item.total_price,
-                    'avg_confidence': item.avg_confidence
+                    'product': self._names[i],
+                    'quantity': int(qty[i]),
+                    'unit_price': float(price[i]),
+                    'total': float(qty[i] * price[i]),
+                    'avg_confidence': float(avg_conf[i])
                 }
-                for item in self.items.values()
+                for i in range(n)
             ]
         }
 
@@ -138,13 +233,72 @@ class VirtualCartManager:
         self.price_calculator = price_calculator
         self.cart_timeout = cart_timeout
         
-        # Maps customer_id -> VirtualCart
+        # Maps customer_id -> VirtualCart. IDs are interned at ingress
+        # (create_cart and the lookup hot paths), so probing these
+        # dicts with ~36-char UUID strings resolves by pointer compare
+        # instead of a character-by-character equality check.
         self.carts: Dict[str, VirtualCart] = {}
-        
-        # Maps session_id -> customer_id
-        self.session_to_customer: Dict[str, str] = {}
-        
+
+        # Maps session_id -> VirtualCart directly, so the session path
+        # is one dict probe instead of session->customer->cart
+        self.session_to_cart: Dict[str, VirtualCart] = {}
+
+        # Expiry timing wheel: one-second buckets of customer_ids keyed
+        # by int(last_updated), plus each cart's current bucket. Cleanup
+        # visits only buckets past the cutoff — O(k) for k expiring
+        # carts — instead of scanning every cart per tick. Entries go
+        # stale if a cart is mutated outside the manager, so cleanup
+        # rechecks last_updated and re-buckets still-live carts.
+        self._buckets: Dict[int, set] = {}
+        self._cart_bucket: Dict[str, int] = {}
+
+        # Second-tier aggregates: per-cart total and item count folded
+        # in on every cart write via the _on_change hook, so the
+        # summary is two array sums instead of nested generators over
+        # every item in every cart. Dense rows, swap-removed like the
+        # cart columns themselves.
+        self._cart_row: Dict[str, int] = {}
+        self._cart_ids: List[str] = []
+        self._cart_totals = np.zeros(_INITIAL_ROWS, np.float64)
+        self._cart_items = np.zeros(_INITIAL_ROWS, np.int64)
+
+        # Trigger the one-off numba compile (cached on disk) here
+        # rather than on the first live cart update
+        cart_total(np.zeros(1, np.int32), np.zeros(1, np.float32), 0)
+
         logger.info(f"VirtualCartManager initialized (timeout={cart_timeout}s)")
+
+    def _on_cart_change(self, cart: VirtualCart):
+        """Fold a cart's totals into the aggregate arrays."""
+        row = self._cart_row.get(cart.customer_id)
+        if row is not None:
+            self._cart_totals[row] = cart.total_amount
+            self._cart_items[row] = cart.item_count
+
+    def _touch(self, customer_id: str, last_updated: float):
+        """Move a cart to the wheel bucket for its update time."""
+        bucket = int(last_updated)
+        old = self._cart_bucket.get(customer_id)
+        if old == bucket:
+            return
+        if old is not None:
+            members = self._buckets.get(old)
+            if members is not None:
+                members.discard(customer_id)
+                if not members:
+                    del self._buckets[old]
+        self._buckets.setdefault(bucket, set()).add(customer_id)
+        self._cart_bucket[customer_id] = bucket
+
+    def _untrack(self, customer_id: str):
+        """Drop a cart from the expiry wheel."""
+        bucket = self._cart_bucket.pop(customer_id, None)
+        if bucket is not None:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(customer_id)
+                if not members:
+                    del self._buckets[bucket]
     
     def create_cart(
         self,
@@ -161,6 +315,8 @@ class VirtualCartManager:
         Returns:
             VirtualCart instance
         """
+        customer_id = sys.intern(customer_id)
+        session_id = sys.intern(session_id)
         if customer_id in self.carts:
             logger.warning(f"Cart already exists for customer {customer_id}")
             return self.carts[customer_id]
@@ -171,21 +327,29 @@ class VirtualCartManager:
         )
         
         self.carts[customer_id] = cart
-        self.session_to_customer[session_id] = customer_id
-        
+        self.session_to_cart[session_id] = cart
+        self._touch(customer_id, cart.last_updated)
+
+        row = len(self._cart_ids)
+        if row == len(self._cart_totals):
+            self._cart_totals = np.resize(self._cart_totals, row * 2)
+            self._cart_items = np.resize(self._cart_items, row * 2)
+        self._cart_row[customer_id] = row
+        self._cart_ids.append(customer_id)
+        self._cart_totals[row] = 0.0
+        self._cart_items[row] = 0
+        cart._on_change = self._on_cart_change
+
         logger.info(f"Created cart for customer {customer_id} (session {session_id})")
         return cart
     
     def get_cart(self, customer_id: str) -> Optional[VirtualCart]:
         """Get cart for a customer."""
-        return self.carts.get(customer_id)
-    
+        return self.carts.get(sys.intern(customer_id))
+
     def get_cart_by_session(self, session_id: str) -> Optional[VirtualCart]:
-        """Get cart by session ID."""
-        customer_id = self.session_to_customer.get(session_id)
-        if customer_id:
-            return self.carts.get(customer_id)
-        return None
+        """Get cart by session ID (one interned dict probe)."""
+        return self.session_to_cart.get(sys.intern(session_id))
     
     def update_cart_from_detections(
         self,
@@ -201,65 +365,87 @@ class VirtualCartManager:
             detections: List of product detection dictionaries
             event_type: 'pick' or 'return'
         """
-        cart = self.get_cart(customer_id)
+        customer_id = sys.intern(customer_id)
+        cart = self.carts.get(customer_id)
         if not cart:
             logger.warning(f"No cart found for customer {customer_id}")
             return
         
+        # One clock read covers the whole detection batch
+        now = time.time()
         for detection in detections:
             product_name = detection.get('class_name', '')
             confidence = detection.get('confidence', 0.0)
-            
+
             # Get price
             if self.price_calculator:
                 price = self.price_calculator(product_name)
             else:
                 price = 0.0
-            
+
             if event_type == 'pick':
-                cart.add_item(product_name, price, confidence)
+                cart.add_item(product_name, price, confidence, timestamp=now)
             elif event_type == 'return':
-                cart.remove_item(product_name, 1)
+                cart.remove_item(product_name, 1, timestamp=now)
         
-        logger.debug(f"Updated cart for {customer_id}: {len(cart.items)} items, ${cart.total_amount:.2f}")
+        self._touch(customer_id, cart.last_updated)
+        logger.debug("Updated cart for %s: %d items, $%.2f",
+                     customer_id, len(cart._name_to_row), cart.total_amount)
     
     def remove_cart(self, customer_id: str):
         """Remove a cart (e.g., after checkout)."""
+        customer_id = sys.intern(customer_id)
         if customer_id in self.carts:
             cart = self.carts[customer_id]
-            session_id = cart.session_id
-            
+
             del self.carts[customer_id]
-            if session_id in self.session_to_customer:
-                del self.session_to_customer[session_id]
-            
+            self.session_to_cart.pop(cart.session_id, None)
+            self._untrack(customer_id)
+            cart._on_change = None
+
+            row = self._cart_row.pop(customer_id, None)
+            if row is not None:
+                last = len(self._cart_ids) - 1
+                if row != last:
+                    moved = self._cart_ids[last]
+                    self._cart_totals[row] = self._cart_totals[last]
+                    self._cart_items[row] = self._cart_items[last]
+                    self._cart_ids[row] = moved
+                    self._cart_row[moved] = row
+                self._cart_ids.pop()
+
             logger.info(f"Removed cart for customer {customer_id}")
     
     def cleanup_expired_carts(self):
         """Remove carts that have been inactive for too long."""
         current_time = time.time()
-        expired_customers = []
-        
-        for customer_id, cart in self.carts.items():
-            if current_time - cart.last_updated > self.cart_timeout:
-                expired_customers.append(customer_id)
-        
-        for customer_id in expired_customers:
-            logger.info(f"Removing expired cart for customer {customer_id}")
-            self.remove_cart(customer_id)
+        cutoff = int(current_time - self.cart_timeout)
+
+        expired_buckets = [b for b in self._buckets if b <= cutoff]
+        for bucket in expired_buckets:
+            for customer_id in tuple(self._buckets.get(bucket, ())):
+                cart = self.carts.get(customer_id)
+                if cart is None:
+                    self._untrack(customer_id)
+                elif current_time - cart.last_updated > self.cart_timeout:
+                    logger.info(f"Removing expired cart for customer {customer_id}")
+                    self.remove_cart(customer_id)
+                else:
+                    # Touched outside the manager; move to a live bucket
+                    self._touch(customer_id, cart.last_updated)
+            if not self._buckets.get(bucket):
+                self._buckets.pop(bucket, None)
     
     def get_all_carts(self) -> List[VirtualCart]:
         """Get all active carts."""
         return list(self.carts.values())
     
     def get_cart_summary(self) -> Dict:
-        """Get summary of all carts."""
+        """Get summary of all carts (two array sums over the aggregates)."""
+        n = len(self._cart_ids)
         return {
-            'total_carts': len(self.carts),
-            'total_items': sum(
-                sum(item.quantity for item in cart.items.values())
-                for cart in self.carts.values()
-            ),
-            'total_value': sum(cart.total_amount for cart in self.carts.values()),
+            'total_carts': n,
+            'total_items': int(self._cart_items[:n].sum()),
+            'total_value': float(self._cart_totals[:n].sum()),
             'carts': [cart.to_dict() for cart in self.carts.values()]
         }
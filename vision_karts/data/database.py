@@ -6,37 +6,93 @@ Provides database interface for persistence (SQLite by default, can use PostgreS
 
 import logging
 import sqlite3
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Iterable, Optional, Sequence
 from pathlib import Path
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Analytics writes coalesce in memory and hit disk in batches: flush
+# when this many rows are pending or the interval elapses
+_ANALYTICS_FLUSH_ROWS = 256
+_ANALYTICS_FLUSH_INTERVAL = 1.0
+
+_ANALYTICS_INSERT = (
+    "INSERT INTO analytics_events "
+    "(event_type, customer_id, session_id, product_name, value, timestamp, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
 
 class Database:
     """
     Database abstraction layer.
+
+    One long-lived WAL-mode connection serves every statement instead of
+    a connect/commit/close cycle per call — with the default rollback
+    journal each statement paid connection setup plus an fsync'd commit,
+    which dominated insert latency on the per-event tables. WAL with
+    synchronous=NORMAL keeps readers unblocked by writers and batches
+    fsyncs; a threading.Lock serializes access (sqlite serializes
+    writers anyway). Analytics events additionally coalesce in memory
+    and land via one executemany per batch from a background flusher,
+    so the detection hot path never blocks on disk.
     """
-    
-    def __init__(self, db_path: str = "data/vision_karts.db"):
+
+    def __init__(
+        self,
+        db_path: str = "data/vision_karts.db",
+        analytics_flush_rows: int = _ANALYTICS_FLUSH_ROWS,
+        analytics_flush_interval: float = _ANALYTICS_FLUSH_INTERVAL
+    ):
         """
         Initialize database.
-        
+
         Args:
             db_path: Path to SQLite database file
+            analytics_flush_rows: Pending analytics rows that trigger a flush
+            analytics_flush_interval: Seconds between background flushes
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            cached_statements=256
+        )
+        self._conn.row_factory = sqlite3.Row
+        for pragma in (
+            "journal_mode=WAL",
+            "synchronous=NORMAL",
+            "temp_store=MEMORY",
+            "mmap_size=268435456",
+        ):
+            self._conn.execute(f"PRAGMA {pragma}")
+
+        self._analytics_buf: List[tuple] = []
+        self._flush_rows = analytics_flush_rows
+        self._flush_stop = threading.Event()
+
         self._initialize_database()
-        
+
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            args=(analytics_flush_interval,),
+            daemon=True,
+            name='vk-db-flush'
+        )
+        self._flusher.start()
+
         logger.info(f"Database initialized: {db_path}")
-    
+
     def _initialize_database(self):
         """Initialize database schema."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
+
             # Customers table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS customers (
@@ -49,7 +105,7 @@ class Database:
                     last_visit TIMESTAMP
                 )
             """)
-            
+
             # Sessions table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS sessions (
@@ -64,7 +120,7 @@ class Database:
                     FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
                 )
             """)
-            
+
             # Transactions table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS transactions (
@@ -80,7 +136,7 @@ class Database:
                     FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
                 )
             """)
-            
+
             # Transaction items table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS transaction_items (
@@ -93,7 +149,7 @@ class Database:
                     FOREIGN KEY (transaction_id) REFERENCES transactions(transaction_id)
                 )
             """)
-            
+
             # Analytics events table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS analytics_events (
@@ -107,36 +163,145 @@ class Database:
                     metadata TEXT
                 )
             """)
-            
+
+            # Indexes for the FK and most-filtered columns; without
+            # them every session/transaction/event lookup is a table
+            # scan
+            for index_sql in (
+                "CREATE INDEX IF NOT EXISTS idx_sessions_customer "
+                "ON sessions(customer_id)",
+                "CREATE INDEX IF NOT EXISTS idx_tx_session "
+                "ON transactions(session_id)",
+                "CREATE INDEX IF NOT EXISTS idx_tx_customer_time "
+                "ON transactions(customer_id, timestamp)",
+                "CREATE INDEX IF NOT EXISTS idx_items_transaction "
+                "ON transaction_items(transaction_id)",
+                "CREATE INDEX IF NOT EXISTS idx_events_customer_time "
+                "ON analytics_events(customer_id, timestamp)",
+            ):
+                cursor.execute(index_sql)
+
             conn.commit()
             logger.info("Database schema initialized")
-    
+
     @contextmanager
     def get_connection(self):
-        """Get database connection context manager."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
-    
+        """
+        Get the shared connection under the lock.
+
+        Commits on clean exit, rolls back on exception. The connection
+        stays open — callers must not close it, and must issue their
+        statements on the yielded connection rather than through the
+        execute_* helpers (the lock is held for the whole block).
+        """
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """Execute SELECT query and return results."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        with self._lock:
+            cursor = self._conn.execute(query, params)
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-    
+        return [dict(row) for row in rows]
+
+    def iter_query(self, query: str, params: tuple = ()):
+        """
+        Execute SELECT query and yield rows as sqlite3.Row.
+
+        Streams straight off the cursor with no per-row dict
+        materialization — use for aggregations and large result sets
+        where execute_query's list of dicts is pure overhead. The
+        connection lock is held until the iterator is exhausted, so
+        don't issue other statements mid-iteration.
+        """
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            while True:
+                row = cursor.fetchone()
+                if row is None:
+                    return
+                yield row
+
     def execute_update(self, query: str, params: tuple = ()):
         """Execute INSERT/UPDATE/DELETE query."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
             return cursor.rowcount
+
+    def execute_many(self, query: str, rows: Iterable[Sequence]):
+        """
+        Execute one statement for a batch of parameter rows.
+
+        One transaction and one commit cover the whole batch, so N
+        inserts pay a single fsync instead of N.
+        """
+        with self._lock:
+            cursor = self._conn.executemany(query, rows)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def log_event(
+        self,
+        event_type: str,
+        customer_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        product_name: Optional[str] = None,
+        value: Optional[float] = None,
+        timestamp: Optional[str] = None,
+        metadata: Optional[str] = None
+    ):
+        """
+        Queue an analytics event for batched insertion.
+
+        Appends to the in-process buffer and returns immediately; rows
+        reach disk when the buffer fills or the background flusher's
+        interval elapses.
+        """
+        row = (event_type, customer_id, session_id, product_name,
+               value, timestamp, metadata)
+        with self._lock:
+            self._analytics_buf.append(row)
+            should_flush = len(self._analytics_buf) >= self._flush_rows
+        if should_flush:
+            self.flush_events()
+
+    def flush_events(self):
+        """Write all buffered analytics events in one batch."""
+        with self._lock:
+            if not self._analytics_buf:
+                return
+            batch = self._analytics_buf
+            self._analytics_buf = []
+            try:
+                self._conn.executemany(_ANALYTICS_INSERT, batch)
+                self._conn.commit()
+            except Exception:
+                # Put the rows back so a transient error doesn't drop data
+                self._analytics_buf[:0] = batch
+                raise
+
+    def _flush_loop(self, interval: float):
+        """Background flusher for the analytics buffer."""
+        while not self._flush_stop.wait(interval):
+            try:
+                self.flush_events()
+            except Exception:
+                logger.error("Analytics flush failed", exc_info=True)
+
+    def close(self):
+        """Flush pending events and close the connection."""
+        self._flush_stop.set()
+        self._flusher.join(timeout=2.0)
+        try:
+            self.flush_events()
+        except Exception:
+            logger.error("Final analytics flush failed", exc_info=True)
+        with self._lock:
+            self._conn.close()
+        logger.info("Database closed")
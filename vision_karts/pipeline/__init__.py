@@ -0,0 +1,6 @@
+"""Processing pipelines for bulk and streaming workloads."""
+
+from .parallel import process_images_parallel
+from .video import stream_frames
+
+__all__ = ['process_images_parallel', 'stream_frames']
@@ -0,0 +1,112 @@
+"""
+Parallel Batch Processing Module
+
+Processes batches of checkout images across CPU cores with a process pool.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-worker singletons, built once by _worker_init so each process pays
+# model load and price-table parse exactly once
+_DETECTOR = None
+_BILLING = None
+
+
+def _worker_init(
+    model_path: Optional[str],
+    prices_path: str,
+    confidence_threshold: float
+):
+    """Initialize per-process detector and billing engine."""
+    global _DETECTOR, _BILLING
+
+    # Heavy imports stay inside the worker so the parent process and
+    # spawn bootstrap don't pay them
+    from ..core import ProductDetector, BillingEngine
+
+    _DETECTOR = ProductDetector(
+        model_path=model_path,
+        confidence_threshold=confidence_threshold,
+        use_acceleration=True,
+        device='cpu'
+    )
+    _BILLING = BillingEngine(prices_path)
+
+
+def _worker_run(image_path: str) -> Dict:
+    """Detect products in one image and return its bill."""
+    from ..utils import load_image
+
+    image = load_image(image_path)
+    detections, _ = _DETECTOR.detect(image)
+    bill = _BILLING.generate_bill(detections)
+    bill['image_path'] = image_path
+    return bill
+
+
+def process_images_parallel(
+    image_paths: List[str],
+    prices_path: str,
+    model_path: Optional[str] = None,
+    confidence_threshold: float = 0.5,
+    n_workers: Optional[int] = None,
+    device: str = 'cpu'
+) -> List[Dict]:
+    """
+    Process a batch of checkout images and return one bill per image.
+
+    On CPU, YOLO inference is effectively single-threaded at the Python
+    level, so the batch is spread over a process pool with one detector
+    per worker. On CUDA the pool is skipped (CUDA contexts don't survive
+    forking cleanly) in favor of single-process batched inference.
+
+    Args:
+        image_paths: Paths to checkout images
+        prices_path: Path to the price database CSV
+        model_path: Optional path to a custom YOLO model
+        confidence_threshold: Minimum confidence for detections
+        n_workers: Worker process count (defaults to CPU count)
+        device: 'cpu' for the process pool, anything else for one process
+
+    Returns:
+        List of bill dictionaries, one per input image, in input order
+    """
+    if not image_paths:
+        return []
+
+    if device != 'cpu':
+        # Single process, one batched forward pass
+        from ..core import ProductDetector, BillingEngine
+        from ..utils import load_image
+
+        detector = ProductDetector(
+            model_path=model_path,
+            confidence_threshold=confidence_threshold,
+            device=device
+        )
+        billing = BillingEngine(prices_path)
+
+        images = [load_image(p) for p in image_paths]
+        batch_detections = detector.detect_batch(images)
+
+        bills = []
+        for image_path, detections in zip(image_paths, batch_detections):
+            bill = billing.generate_bill(detections)
+            bill['image_path'] = image_path
+            bills.append(bill)
+        return bills
+
+    n_workers = n_workers or os.cpu_count()
+    logger.info(f"Processing {len(image_paths)} images with {n_workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_worker_init,
+        initargs=(model_path, prices_path, confidence_threshold)
+    ) as executor:
+        return list(executor.map(_worker_run, image_paths))
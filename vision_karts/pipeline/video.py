@@ -0,0 +1,110 @@
+"""
+Video Streaming Module
+
+Streams frames from video files and RTSP cameras for continuous processing.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _open_gpu_reader(source):
+    """Try to open an NVDEC-backed reader; None when unavailable."""
+    try:
+        reader = cv2.cudacodec.createVideoReader(str(source))
+        logger.info(f"Using GPU (NVDEC) video decode for {source}")
+        return reader
+    except Exception:
+        return None
+
+
+def stream_frames(
+    source,
+    target_fps: Optional[float] = None,
+    queue_size: int = 4
+) -> Iterator[Tuple[np.ndarray, float]]:
+    """
+    Stream decoded frames from a video file, RTSP URL, or camera index.
+
+    Decoding runs on a producer thread feeding a bounded queue, so the
+    decoder (NVDEC when OpenCV is built with cudacodec, FFmpeg on CPU
+    otherwise) overlaps with downstream inference instead of serializing
+    with it. One H.264 stream replaces per-frame JPEG decode entirely.
+
+    Args:
+        source: Video file path, RTSP URL, or integer camera index
+        target_fps: Optional cap on yielded frames per second
+        queue_size: Bound on in-flight decoded frames (backpressure)
+
+    Yields:
+        Tuples of (frame BGR ndarray, capture timestamp)
+    """
+    frame_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    min_interval = 1.0 / target_fps if target_fps else 0.0
+
+    def _produce():
+        gpu_reader = _open_gpu_reader(source)
+        cap = None
+        if gpu_reader is None:
+            cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+            if not cap.isOpened():
+                # Camera indexes and some sources need the default backend
+                cap = cv2.VideoCapture(source)
+            if not cap.isOpened():
+                logger.error(f"Failed to open video source: {source}")
+                frame_queue.put(None)
+                return
+
+        last_yield = 0.0
+        try:
+            while not stop_event.is_set():
+                if gpu_reader is not None:
+                    ret, gpu_frame = gpu_reader.nextFrame()
+                    frame = gpu_frame.download() if ret else None
+                else:
+                    ret, frame = cap.read()
+
+                if not ret or frame is None:
+                    break
+
+                now = time.time()
+                if min_interval and now - last_yield < min_interval:
+                    continue
+                last_yield = now
+
+                # Bounded put that still honors shutdown requests
+                while not stop_event.is_set():
+                    try:
+                        frame_queue.put((frame, now), timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        finally:
+            if cap is not None:
+                cap.release()
+            try:
+                frame_queue.put_nowait(None)  # End-of-stream sentinel
+            except queue.Full:
+                frame_queue.get_nowait()
+                frame_queue.put_nowait(None)
+
+    producer = threading.Thread(target=_produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        stop_event.set()
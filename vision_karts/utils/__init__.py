@@ -1,6 +1,26 @@
 """Utility modules for Vision Karts."""
 
-from .image_utils import load_image, preprocess_image, visualize_detections
+from .image_utils import (
+    load_image,
+    preprocess_image,
+    preprocess_image_fused,
+    save_annotated_async,
+    visualize_detections,
+    visualize_detections_soa,
+)
 from .config_loader import load_config
+from .serialization import dumps_json, loads_json
+from .time_utils import iso_now
 
-__all__ = ['load_image', 'preprocess_image', 'visualize_detections', 'load_config']
+__all__ = [
+    'load_image',
+    'preprocess_image',
+    'preprocess_image_fused',
+    'save_annotated_async',
+    'visualize_detections',
+    'visualize_detections_soa',
+    'load_config',
+    'dumps_json',
+    'loads_json',
+    'iso_now',
+]
@@ -3,26 +3,51 @@
 import json
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+from .serialization import loads_json
+
+# libyaml-backed parser when PyYAML was built against it; an order of
+# magnitude faster than the pure-Python SafeLoader
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Parsed configs keyed by resolved path, invalidated by file mtime so
+# repeated loads of an unchanged file skip parsing entirely
+_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
 
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """
     Load configuration from JSON or YAML file.
-    
+
+    Results are cached per file and reused until the file's mtime
+    changes.
+
     Args:
         config_path: Path to configuration file
-    
+
     Returns:
         Configuration dictionary
     """
     config_path = Path(config_path)
-    
+
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
-    
-    with open(config_path, 'r') as f:
-        if config_path.suffix.lower() == '.yaml' or config_path.suffix.lower() == '.yml':
-            return yaml.safe_load(f)
-        else:
-            return json.load(f)
+
+    mtime_ns = config_path.stat().st_mtime_ns
+    key = str(config_path.resolve())
+    cached = _CACHE.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    if config_path.suffix.lower() in ('.yaml', '.yml'):
+        with open(config_path, 'r') as f:
+            config = yaml.load(f, Loader=_YamlLoader)
+    else:
+        config = loads_json(config_path.read_bytes())
+
+    _CACHE[key] = (mtime_ns, config)
+    return config
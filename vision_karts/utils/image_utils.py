@@ -1,10 +1,58 @@
 """Image processing utilities."""
 
+import atexit
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 from typing import List, Dict, Optional
 from pathlib import Path
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], np.float32)
+
+
+@functools.lru_cache(maxsize=4096)
+def _text_size(text: str):
+    """
+    Measure text at the annotation font, cached per string.
+
+    The label vocabulary is the product catalog, so at 30 boxes/frame
+    nearly every measurement after warm-up is a cache hit instead of a
+    cv2.getTextSize call.
+    """
+    (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+    return w, h, baseline
+
+# Background writer pool for annotated-image saves: OpenCV releases the
+# GIL during encode, so writes genuinely overlap with subsequent work
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='vk-io')
+atexit.register(_IO_POOL.shutdown)
+
+_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+# OpenCL Transparent API: wrapping frames in cv2.UMat routes resize to
+# the GPU when a device exists. VISION_KARTS_OPENCL=0 forces the CPU
+# path (e.g. when the OpenCL driver is flaky)
+try:
+    _USE_UMAT = (
+        os.environ.get('VISION_KARTS_OPENCL', '1') != '0'
+        and cv2.ocl.haveOpenCL()
+    )
+except AttributeError:
+    _USE_UMAT = False
+
 
 def load_image(image_path: str) -> np.ndarray:
     """
@@ -16,68 +64,215 @@ def load_image(image_path: str) -> np.ndarray:
     Returns:
         Image as numpy array (BGR format)
     """
-    if not Path(image_path).exists():
+    path = Path(image_path)
+    if not path.exists():
         raise FileNotFoundError(f"Image not found: {image_path}")
-    
-    image = cv2.imread(image_path)
+
+    # Read bytes then decode: keeps the file IO a single read syscall and
+    # lets callers overlap decode with other work more easily than imread
+    buffer = np.frombuffer(path.read_bytes(), np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
     if image is None:
         raise ValueError(f"Could not load image from {image_path}")
-    
+
     return image
 
 
-def preprocess_image(image: np.ndarray, target_size: Optional[tuple] = None) -> np.ndarray:
+def save_annotated_async(image_path: str, image: np.ndarray):
+    """
+    Save an annotated image on a background writer thread.
+
+    JPEG encode of a 1080p frame costs 5-15 ms; offloading it keeps
+    disk IO off the checkout critical path. Non-JPEG extensions are
+    written with OpenCV defaults.
+
+    Args:
+        image_path: Destination file path
+        image: Image to save (BGR format)
+
+    Returns:
+        Future resolving to cv2.imwrite's success flag
+    """
+    params = (
+        _JPEG_PARAMS
+        if Path(image_path).suffix.lower() in ('.jpg', '.jpeg') else []
+    )
+
+    def _write():
+        ok = cv2.imwrite(image_path, image, params)
+        if not ok:
+            logger.error(f"Failed to write annotated image: {image_path}")
+        return ok
+
+    return _IO_POOL.submit(_write)
+
+
+def preprocess_image(
+    image: np.ndarray,
+    target_size: Optional[tuple] = None,
+    as_umat: bool = False
+):
     """
     Preprocess image for model inference.
-    
+
+    The resize runs through OpenCL (cv2.UMat) when a device is
+    available, overlapping the 1080p -> model-input downscale with CPU
+    work; INTER_AREA keeps downscaled detail crisp. Pass as_umat=True
+    for consumers that accept UMat directly, skipping the
+    device-to-host copy.
+
     Args:
         image: Input image (BGR format)
         target_size: Optional target size (width, height)
-    
+        as_umat: Return the on-device cv2.UMat instead of an ndarray
+            (only meaningful on the OpenCL path)
+
     Returns:
         Preprocessed image
     """
     if target_size:
-        image = cv2.resize(image, target_size)
-    
+        if _USE_UMAT:
+            resized = cv2.resize(
+                cv2.UMat(image), target_size, interpolation=cv2.INTER_AREA
+            )
+            return resized if as_umat else resized.get()
+        image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
+
     return image
 
 
-def visualize_detections(
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _fused_preprocess(img, mean, std, out):
+        # BGR uint8 HWC in, normalized float32 CHW RGB out, one pass:
+        # each byte is read exactly once instead of separate
+        # convert/rescale/normalize/transpose sweeps over the frame
+        h, w = img.shape[0], img.shape[1]
+        for y in prange(h):
+            for x in range(w):
+                b = img[y, x, 0]
+                g = img[y, x, 1]
+                r = img[y, x, 2]
+                out[0, y, x] = (r / 255.0 - mean[0]) / std[0]
+                out[1, y, x] = (g / 255.0 - mean[1]) / std[1]
+                out[2, y, x] = (b / 255.0 - mean[2]) / std[2]
+else:
+    def _fused_preprocess(img, mean, std, out):
+        # NumPy fallback: still avoids intermediate HWC float copies
+        # beyond the one rescaled buffer
+        rgb = img[:, :, ::-1].astype(np.float32) / 255.0
+        for c in range(3):
+            out[c] = (rgb[:, :, c] - mean[c]) / std[c]
+
+
+def preprocess_image_fused(
     image: np.ndarray,
-    detections: List[Dict],
-    show_confidence: bool = True
+    mean: Optional[np.ndarray] = None,
+    std: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
-    Draw bounding boxes and labels on image.
-    
+    Convert a BGR uint8 frame to a normalized float32 CHW RGB tensor.
+
+    Fuses BGR->RGB, /255 rescale, mean/std normalization and HWC->CHW
+    into one compiled pass (numba, parallel across rows) instead of
+    four separate sweeps with four buffer allocations. For inference
+    backends that take preprocessed tensors directly; pass the same
+    out= buffer every frame to avoid reallocating the output.
+
+    Args:
+        image: Input frame (BGR uint8, HWC)
+        mean: Per-channel RGB mean (defaults to ImageNet)
+        std: Per-channel RGB std (defaults to ImageNet)
+        out: Optional (3, H, W) float32 buffer reused across frames
+
+    Returns:
+        Normalized (3, H, W) float32 tensor (out when given)
+    """
+    h, w = image.shape[0], image.shape[1]
+    if mean is None:
+        mean = _IMAGENET_MEAN
+    if std is None:
+        std = _IMAGENET_STD
+    if out is None or out.shape != (3, h, w):
+        out = np.empty((3, h, w), np.float32)
+    _fused_preprocess(image, mean, std, out)
+    return out
+
+
+def visualize_detections_soa(
+    image: np.ndarray,
+    boxes: np.ndarray,
+    scores: Optional[np.ndarray],
+    class_names: List[str],
+    show_confidence: bool = True,
+    inplace: bool = False,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw bounding boxes and labels from column-wise detections.
+
+    Coordinates are cast to int in one vectorized pass and labels are
+    preformatted up front, so the loop body is only the OpenCV drawing
+    calls — no per-box dict indirection or map(int, ...) on the frame
+    hot path.
+
+    By default the frame is copied before drawing (~6 MB of memcpy per
+    1080p frame). Callers that do not retain the clean frame — e.g. a
+    throwaway frame already popped from the capture ring — should pass
+    inplace=True to draw directly into it, or hand a preallocated
+    buffer via out= to reuse one allocation across frames when the
+    source must stay pristine.
+
     Args:
         image: Input image (BGR format)
-        detections: List of detection dictionaries
+        boxes: (N, 4) array of [x1, y1, x2, y2] coordinates
+        scores: Per-box confidences (or None)
+        class_names: Per-box class names
         show_confidence: Whether to show confidence scores
-    
+        inplace: Draw into image itself instead of a copy
+        out: Optional same-shape buffer to draw into (ignored when
+            inplace is set)
+
     Returns:
-        Annotated image
+        Annotated image (image itself when inplace, out when given)
     """
-    annotated = image.copy()
-    
-    for detection in detections:
-        bbox = detection['bbox']
-        x1, y1, x2, y2 = map(int, bbox)
-        
+    if inplace:
+        # cv2 needs contiguous memory; a contiguous frame draws with
+        # zero copies, a strided view falls back to one
+        annotated = np.ascontiguousarray(image)
+    elif out is not None:
+        np.copyto(out, image)
+        annotated = out
+    else:
+        annotated = np.ascontiguousarray(image)
+        if annotated is image:
+            annotated = image.copy()
+
+    ib = np.asarray(boxes, np.float32).reshape(-1, 4).astype(np.int32)
+    if show_confidence and scores is not None:
+        labels = [f"{n} {s:.2f}" for n, s in zip(class_names, scores)]
+        # Per-frame confidence digits would defeat the size cache, so
+        # measure the cached class name plus a constant-width suffix
+        # (Hershey digits are uniform width)
+        suffix_w, suffix_h, suffix_bl = _text_size(" 0.00")
+    else:
+        labels = list(class_names)
+        suffix_w = suffix_h = suffix_bl = 0
+
+    for i in range(len(ib)):
+        x1, y1, x2, y2 = ib[i]
+        label = labels[i]
+
         # Draw bounding box
         cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        
-        # Draw label
-        label = detection['class_name']
-        if show_confidence and 'confidence' in detection:
-            label += f" {detection['confidence']:.2f}"
-        
-        # Calculate text size for background
-        (text_width, text_height), baseline = cv2.getTextSize(
-            label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2
-        )
-        
+
+        # Calculate text size for background (cached per class name)
+        name_w, name_h, name_bl = _text_size(class_names[i])
+        text_width = name_w + suffix_w
+        text_height = max(name_h, suffix_h)
+        baseline = max(name_bl, suffix_bl)
+
         # Draw text background
         cv2.rectangle(
             annotated,
@@ -86,7 +281,7 @@ def visualize_detections(
             (0, 255, 0),
             -1
         )
-        
+
         # Draw text
         cv2.putText(
             annotated,
@@ -97,5 +292,47 @@ def visualize_detections(
             (0, 0, 0),
             2
         )
-    
+
     return annotated
+
+
+def visualize_detections(
+    image: np.ndarray,
+    detections: List[Dict],
+    show_confidence: bool = True,
+    inplace: bool = False,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw bounding boxes and labels on image.
+
+    Thin wrapper that packs detection dicts into columns and delegates
+    to visualize_detections_soa (see there for the inplace/out
+    aliasing contract).
+
+    Args:
+        image: Input image (BGR format)
+        detections: List of detection dictionaries
+        show_confidence: Whether to show confidence scores
+        inplace: Draw into image itself instead of a copy
+        out: Optional same-shape buffer to draw into
+
+    Returns:
+        Annotated image
+    """
+    if not detections:
+        if inplace:
+            return image
+        if out is not None:
+            np.copyto(out, image)
+            return out
+        return image.copy()
+
+    boxes = np.array([d['bbox'] for d in detections], np.float32)
+    scores = [d.get('confidence', 0.0) for d in detections]
+    class_names = [d['class_name'] for d in detections]
+    show = show_confidence and 'confidence' in detections[0]
+    return visualize_detections_soa(
+        image, boxes, scores, class_names, show,
+        inplace=inplace, out=out
+    )
@@ -0,0 +1,54 @@
+"""
+Serialization Utilities Module
+
+Shared JSON encoding for transaction, receipt and event payloads.
+"""
+
+import json
+import logging
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def dumps_json(obj, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON bytes.
+
+    Uses orjson when installed (C implementation, 3-10x faster than
+    stdlib json, serializes numpy scalars/arrays directly and emits
+    bytes without a separate encode step); falls back to stdlib json.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def loads_json(data: bytes):
+    """
+    Deserialize JSON bytes (orjson when installed, stdlib otherwise).
+
+    Args:
+        data: UTF-8 encoded JSON bytes
+
+    Returns:
+        The decoded object
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,33 @@
+"""
+Time Utilities Module
+
+Shared timestamp helpers for the transaction hot paths.
+"""
+
+import time
+from datetime import datetime
+
+# Per-second cache for the whole-second prefix of ISO timestamps; the
+# sub-second suffix is formatted from the raw float per call
+_cached_sec = 0
+_cached_prefix = ''
+
+
+def iso_now() -> str:
+    """
+    Current local time as an ISO-8601 string with microseconds.
+
+    Equivalent to datetime.now().isoformat(), but the datetime
+    construction and strftime-style formatting run at most once per
+    wall-clock second — repeat calls within the same second only format
+    the six-digit microsecond suffix. This keeps allocations off the
+    checkout path under burst load.
+    """
+    global _cached_sec, _cached_prefix
+
+    t = time.time()
+    s = int(t)
+    if s != _cached_sec:
+        _cached_sec = s
+        _cached_prefix = datetime.fromtimestamp(s).isoformat()
+    return f"{_cached_prefix}.{int((t - s) * 1e6):06d}"